@@ -0,0 +1,211 @@
+#!/bin/env python3
+
+import argparse
+import gc
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from roadmap.trello import BoardRegistry, TrelloBoard, TrelloFeature
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Time and memory of building features on a synthetic board"
+    )
+    parser.add_argument(
+        "--cards",
+        type=int,
+        default=5000,
+        help="Number of cards on the synthetic board",
+    )
+    parser.add_argument(
+        "--attachments",
+        type=int,
+        default=3,
+        help="Attachments per card",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=1.0,
+        help="Simulated milliseconds per API request",
+    )
+    return parser.parse_args()
+
+
+class SyntheticClient:
+    """Serve a synthetic board through the fetch_json calls TrelloBoard makes"""
+
+    def __init__(self, cards, attachments, latency):
+        self.latency = latency / 1000
+        self.requests = 0
+        self.cards = [
+            {
+                "id": f"{n:024x}",
+                "name": f"Feature {n}",
+                "desc": f"Description of feature {n} " * 4,
+                "closed": n % 2 == 0,
+                "idList": "list",
+                "idLabels": ["epic"] if n % 10 == 0 else ["release"],
+                "url": f"https://trello.com/c/{n:08x}/feature-{n}",
+                "shortUrl": f"https://trello.com/c/{n:08x}",
+                "dateLastActivity": "2021-05-01T10:00:00.000Z",
+                "customFieldItems": [
+                    {"idCustomField": "points", "value": {"number": str(n % 13)}}
+                ],
+            }
+            for n in range(cards, 0, -1)
+        ]
+        self.attachments = {
+            card["id"]: [
+                {
+                    "id": f"{card['id']}-{a}",
+                    "name": f"Link {a}",
+                    "url": f"https://github.com/example/pull/{a}",
+                    "isUpload": False,
+                }
+                for a in range(attachments)
+            ]
+            for card in self.cards
+        }
+
+    def board_json(self):
+        """Nested board response as loaded for a board snapshot"""
+        return {
+            "cards": [
+                dict(
+                    card,
+                    idBoard="synthetic",
+                    idMembers=[],
+                    idShort=n,
+                    pos=n,
+                    dueComplete=False,
+                    badges={
+                        "checkItems": 0,
+                        "attachments": len(self.attachments[card["id"]]),
+                    },
+                    labels=[
+                        {"id": label_id, "name": label_id, "color": "green"}
+                        for label_id in card["idLabels"]
+                    ],
+                    attachments=self.attachments[card["id"]],
+                )
+                for n, card in enumerate(self.cards)
+            ],
+            "lists": [{"id": "list", "name": "Backlog", "closed": False, "pos": 1}],
+            "labels": [],
+            "customFields": [
+                {
+                    "id": "points",
+                    "name": TrelloBoard.STORY_POINTS_FIELD,
+                    "type": "number",
+                }
+            ],
+            "checklists": [],
+        }
+
+    def fetch_json(self, path, http_method="GET", query_params=None, post_args=None):
+        self.requests += 1
+        time.sleep(self.latency)
+        query_params = query_params or {}
+        if path == "/boards/synthetic":
+            return self.board_json()
+        if path == "/batch":
+            return [
+                {"200": self.attachments[url.split("/")[2]]}
+                for url in query_params["urls"].split(",")
+            ]
+        if path.startswith("/cards/"):
+            return self.attachments[path.split("/")[2]]
+        before = query_params.get("before")
+        cards = [c for c in self.cards if not before or c["id"] < before]
+        page = cards[: query_params["limit"]]
+        if query_params.get("attachments") == "true":
+            page = [dict(c, attachments=self.attachments[c["id"]]) for c in page]
+        return page
+
+
+def synthetic_board(args):
+    client = SyntheticClient(args.cards, args.attachments, args.latency)
+    board = TrelloBoard(client, name="Synthetic")
+    board._resolved_board = SimpleNamespace(
+        id="synthetic", name="Synthetic", client=client
+    )
+    board._registry = BoardRegistry(
+        [SimpleNamespace(id="list", name="Backlog")],
+        [
+            SimpleNamespace(id="epic", name="Epic", color="sky"),
+            SimpleNamespace(id="release", name="21.10", color="green"),
+        ],
+        [SimpleNamespace(id="points", name=board.STORY_POINTS_FIELD)],
+    )
+    return client, board
+
+
+def names_and_points(board):
+    return list(board.iter_features(visible=False))
+
+
+def eager_attachments(board):
+    sp_field = board.sp_field
+    return [
+        TrelloFeature(card, "Undefined", sp_field, attachments=True)
+        for card in board.iter_cards()
+    ]
+
+
+def bulk_attachments(board):
+    features = list(board.iter_features(visible=False))
+    board.load_attachments(features)
+    return features
+
+
+def paged_attachments(board):
+    return list(board.iter_features(visible=False, attachments=True))
+
+
+def snapshot_attachments(board):
+    features = list(board.iter_features(visible=True))
+    for feature in features:
+        feature.links
+    return features
+
+
+def main():
+    args = parse_args()
+    print(
+        f"{args.cards} cards, {args.attachments} attachments per card,"
+        f" {args.latency}ms per request"
+    )
+    print(
+        f"{'scenario':<28}{'seconds':>10}{'peak MiB':>10}{'kept MiB':>10}"
+        f"{'requests':>10}"
+    )
+    for name, build in [
+        ("names and story points", names_and_points),
+        ("attachments per card", eager_attachments),
+        ("attachments in bulk", bulk_attachments),
+        ("attachments with the cards", paged_attachments),
+        ("snapshot attachments", snapshot_attachments),
+    ]:
+        client, board = synthetic_board(args)
+        tracemalloc.start()
+        start = time.perf_counter()
+        features = build(board)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] / 2**20
+        # Memory still held through the features once the board is gone
+        del board
+        gc.collect()
+        kept = tracemalloc.get_traced_memory()[0] / 2**20
+        tracemalloc.stop()
+        assert len(features) == args.cards
+        print(
+            f"{name:<28}{elapsed:>10.2f}{peak:>10.1f}{kept:>10.1f}"
+            f"{client.requests:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
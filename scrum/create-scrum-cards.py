@@ -2,6 +2,7 @@
 
 import argparse
 
+from roadmap.trello import create_releases
 from utils import CDKUtils
 
 
@@ -17,23 +18,24 @@ def parse_args():
 def main():
     args = parse_args()
     utils = CDKUtils()
-    roadmap = utils.get_product_roadmap(args.release)
-    roadmap_features = roadmap.get_features()
     teams = [
         "CDK",
         "MicroK8s",
     ]
+    # Kubeflow plans from its own roadmap
+    kubeflow = "Kubeflow"
+    boards = {team: utils.get_scrum_board(team) for team in teams + [kubeflow]}
+    create_releases(list(boards.values()), [args.release])
+    roadmap = utils.get_product_roadmap(args.release)
+    roadmap_features = roadmap.get_features()
     for team in teams:
-        board = utils.get_scrum_board(team)
-        board.create_release(args.release)
+        board = boards[team]
         board.create_cards(roadmap_features)
         board.tag_release(roadmap_features)
 
-    team = "Kubeflow"
-    roadmap = utils.get_product_roadmap(args.release, team=team)
+    roadmap = utils.get_product_roadmap(args.release, team=kubeflow)
     roadmap_features = roadmap.get_features()
-    board = utils.get_scrum_board(team)
-    board.create_release(args.release)
+    board = boards[kubeflow]
     board.create_cards(roadmap_features)
     board.tag_release(roadmap_features)
 
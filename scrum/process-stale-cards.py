@@ -1,6 +1,5 @@
 #!/bin/env python3
-import datetime
-
+from roadmap.stale import StaleCardEngine
 from utils import CDKUtils
 
 
@@ -11,35 +10,14 @@ def main():
         "MicroK8s",
         "Kubeflow",
     ]
+    # Scrum boards: label stale cards and move inactive+stale cards to backlog
+    engine = StaleCardEngine()
+    engine.logger.set_level("info")
     for team in teams:
-        # Scrum board: label stale cards and move inactive+stale cards to backlog
-        scrum_board = utils.get_scrum_board(team)
-        scrum_board.logger.set_level("info")
-        scrum_board.label_stale_cards()
-        scrum_board.logger.set_level("warning")
-        move_delta = datetime.timedelta(days=10)
-        inactive_cards = scrum_board.get_stale_cards(
-            lists=scrum_board.IN_PROGRESS_LISTS, delta=move_delta
+        engine.add_team(
+            team, utils.get_scrum_board(team), utils.get_backlog_board(team)
         )
-        backlog_board = utils.get_backlog_board(team)
-        for list in backlog_board.lists:
-            if list.name == "Backlog":
-                inactive_list = list
-        for card in inactive_cards:
-            try:
-                next(
-                    filter(
-                        lambda x: x.name == scrum_board.STALE_LABEL_NAME
-                        and x.color == scrum_board.STALE_LABEL_COLOR,
-                        card.labels,
-                    )
-                )
-                # Card has the stale label
-                print(f"Found inactive and stale card moving: {team}:{card.name}")
-                card.change_board(backlog_board.id, inactive_list.id)
-            except (StopIteration, TypeError):
-                # No lables, or no stale label
-                pass
+    engine.run()
 
 
 if __name__ == "__main__":
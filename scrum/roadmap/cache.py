@@ -0,0 +1,203 @@
+"""Persistent Trello board cache."""
+import datetime
+import json
+import sqlite3
+import threading
+
+from roadmap.logging import Logger
+
+
+class BoardCache:
+    """SQLite store of raw board snapshots keyed by board id and card filter
+
+    Board ids resolved from a short_id or board name are stored as well.
+
+    Snapshots are refreshed from the board's action feed: only cards touched by
+    actions since the last seen action are refetched. A full reload happens when
+    the feed is truncated, when board metadata changed, or after MAX_AGE.
+    """
+
+    ACTION_LIMIT = 1000
+    BATCH_SIZE = 10
+    MAX_AGE = datetime.timedelta(days=1)
+    CARD_QUERY = "attachments=true&customFieldItems=true&checklists=all"
+    # Actions that only change the cards they name, anything else reloads
+    CARD_ACTIONS = {
+        "addAttachmentToCard",
+        "addChecklistToCard",
+        "addLabelToCard",
+        "addMemberToCard",
+        "commentCard",
+        "convertToCardFromCheckItem",
+        "copyCard",
+        "copyCommentCard",
+        "createCard",
+        "createCheckItem",
+        "deleteAttachmentFromCard",
+        "deleteCard",
+        "deleteCheckItem",
+        "deleteComment",
+        "emailCard",
+        "moveCardFromBoard",
+        "moveCardToBoard",
+        "removeChecklistFromCard",
+        "removeLabelFromCard",
+        "removeMemberFromCard",
+        "updateCard",
+        "updateCheckItem",
+        "updateCheckItemStateOnCard",
+        "updateChecklist",
+        "updateComment",
+        "updateCustomFieldItem",
+    }
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.logger = Logger()
+        # Snapshots can be reloaded from write executor threads
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS boards ("
+                " board_id TEXT, card_filter TEXT, data TEXT,"
+                " last_action TEXT, loaded TEXT,"
+                " PRIMARY KEY (board_id, card_filter))"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS board_ids ("
+                " kind TEXT, key TEXT, board_id TEXT, name TEXT,"
+                " PRIMARY KEY (kind, key))"
+            )
+
+    def get(self, board_id, card_filter):
+        """Return (data, last_action, loaded) for a board, or None"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data, last_action, loaded FROM boards"
+                " WHERE board_id = ? AND card_filter = ?",
+                (board_id, card_filter),
+            ).fetchone()
+        if not row:
+            return None
+        data, last_action, loaded = row
+        return json.loads(data), last_action, datetime.datetime.fromisoformat(loaded)
+
+    def put(self, board_id, card_filter, data, last_action, loaded=None):
+        loaded = loaded or datetime.datetime.now()
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO boards VALUES (?, ?, ?, ?, ?)",
+                (
+                    board_id,
+                    card_filter,
+                    json.dumps(data),
+                    last_action,
+                    loaded.isoformat(),
+                ),
+            )
+
+    def get_board_id(self, kind, key):
+        """Return (board id, name) for a short_id or name, or None"""
+        with self._lock:
+            return self._db.execute(
+                "SELECT board_id, name FROM board_ids WHERE kind = ? AND key = ?",
+                (kind, key),
+            ).fetchone()
+
+    def put_board_id(self, kind, key, board_id, name):
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO board_ids VALUES (?, ?, ?, ?)",
+                (kind, key, board_id, name),
+            )
+
+    def invalidate(self, board_id):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM boards WHERE board_id = ?", (board_id,))
+
+    def board_data(self, client, board_id, card_filter, query):
+        """Return raw board data, synced from the action feed when cached"""
+        cached = self.get(board_id, card_filter)
+        if cached:
+            data, last_action, loaded = cached
+            if datetime.datetime.now() - loaded < self.MAX_AGE:
+                synced = self._sync(client, board_id, card_filter, data, last_action)
+                if synced is not None:
+                    data, last_action = synced
+                    self.put(board_id, card_filter, data, last_action, loaded)
+                    return data
+        self.logger.debug(f"Full reload of board {board_id} ({card_filter})")
+        data = client.fetch_json(f"/boards/{board_id}", query_params=query)
+        actions = data.pop("actions", [])
+        last_action = actions[0]["id"] if actions else None
+        self.put(board_id, card_filter, data, last_action)
+        return data
+
+    def _sync(self, client, board_id, card_filter, data, last_action):
+        """Apply actions since last_action to data, None if a reload is needed"""
+        if not last_action:
+            return None
+        actions = client.fetch_json(
+            f"/boards/{board_id}/actions",
+            query_params={"since": last_action, "limit": self.ACTION_LIMIT},
+        )
+        if not actions:
+            return data, last_action
+        if len(actions) >= self.ACTION_LIMIT:
+            self.logger.debug(f"Action feed truncated for board {board_id}")
+            return None
+        card_ids = []
+        for action in actions:
+            if action["type"] not in self.CARD_ACTIONS:
+                self.logger.debug(f"Board {board_id} changed by {action['type']}")
+                return None
+            card = action.get("data", {}).get("card")
+            if card and card["id"] not in card_ids:
+                card_ids.append(card["id"])
+        self.logger.debug(f"Syncing {len(card_ids)} cards on board {board_id}")
+        self._apply_cards(client, card_filter, data, card_ids)
+        return data, actions[0]["id"]
+
+    def _apply_cards(self, client, card_filter, data, card_ids):
+        """Refetch card_ids in batches and replace them in data"""
+        fetched = {}
+        for i in range(0, len(card_ids), self.BATCH_SIZE):
+            chunk = card_ids[i : i + self.BATCH_SIZE]
+            urls = ",".join(f"/cards/{card_id}?{self.CARD_QUERY}" for card_id in chunk)
+            responses = client.fetch_json("/batch", query_params={"urls": urls})
+            for card_id, response in zip(chunk, responses):
+                fetched[card_id] = response.get("200")
+
+        checklists = [
+            checklist
+            for checklist in data.get("checklists", [])
+            if checklist.get("idCard") not in fetched
+        ]
+        cards = []
+        for card in data.get("cards", []):
+            if card["id"] in fetched:
+                card = self._visible_card(fetched.pop(card["id"]), data, card_filter)
+            if card:
+                cards.append(card)
+        for card in fetched.values():
+            # Cards new to this board
+            card = self._visible_card(card, data, card_filter)
+            if card:
+                cards.append(card)
+        for card in cards:
+            checklists.extend(card.pop("checklists", []))
+        data["cards"] = cards
+        data["checklists"] = checklists
+
+    @staticmethod
+    def _visible_card(card, data, card_filter):
+        """Return card if it still belongs in the snapshot, otherwise None"""
+        if not card or card.get("idBoard") != data["id"]:
+            # Deleted or moved to another board
+            return None
+        if card_filter == "visible":
+            closed_lists = {lst["id"] for lst in data.get("lists", []) if lst["closed"]}
+            if card["closed"] or card["idList"] in closed_lists:
+                return None
+        return card
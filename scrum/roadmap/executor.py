@@ -0,0 +1,192 @@
+"""Concurrent, rate limited write executor."""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from roadmap.logging import Logger
+
+
+def status_code(error):
+    """Return the HTTP status of an API error, or None"""
+    for attr in ("status_code", "_status"):
+        status = getattr(error, attr, None)
+        if isinstance(status, int):
+            return status
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None)
+
+
+class TokenBucket:
+    """Allow at most capacity requests in any period seconds"""
+
+    def __init__(self, capacity, period):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Hold back every request for seconds, used when the API returns 429"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, 0) - seconds * self.rate
+
+
+class Pending:
+    """Result of a queued mutation, can be passed as an argument to later ones"""
+
+    def __init__(self, key, description):
+        self.key = key
+        self.description = description
+        self.done = False
+        self.skipped = False
+        self.result = None
+        self.error = None
+
+    def __repr__(self):
+        return f"<Pending {self.description}>"
+
+
+class WriteSummary:
+    """Outcome of a flushed set of mutations"""
+
+    def __init__(self):
+        self.succeeded = []
+        self.failed = []
+        self.skipped = []
+        self.planned = []
+
+    @property
+    def total(self):
+        return len(self.succeeded) + len(self.failed) + len(self.skipped)
+
+    def log(self, logger):
+        if self.planned:
+            logger.info(f"Would write {len(self.planned)} changes")
+            return
+        logger.info(
+            f"Wrote {len(self.succeeded)}/{self.total} changes, "
+            f"{len(self.failed)} failed, {len(self.skipped)} skipped"
+        )
+        for pending in self.failed:
+            logger.error(f"Failed {pending.description}: {pending.error}")
+        for pending in self.skipped:
+            logger.warn(f"Skipped {pending.description}: {pending.error}")
+
+    def __repr__(self):
+        return (
+            f"{len(self.succeeded)} succeeded:{len(self.failed)} failed:"
+            f"{len(self.skipped)} skipped"
+        )
+
+
+class WriteExecutor:
+    """Queue mutations and send them through a bounded thread pool
+
+    Mutations sharing a key run in the order they were submitted, one at a time,
+    and a failure skips the remaining mutations for that key. Every call waits
+    on all buckets, and a 429 response pauses them before the call is retried.
+    In dry run mode mutations are only logged.
+    """
+
+    RETRIES = 3
+    BACKOFF = 2
+
+    def __init__(self, workers=8, buckets=None, dry_run=False):
+        self.workers = workers
+        self.buckets = buckets or []
+        self.dry_run = dry_run
+        self.logger = Logger()
+        self._queues = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key, func, *args, description=None, **kwargs):
+        """Queue func(*args, **kwargs) after earlier mutations for key"""
+        pending = Pending(key, description or f"{func.__name__} {key}")
+        with self._lock:
+            self._queues.setdefault(key, []).append((pending, func, args, kwargs))
+        return pending
+
+    def flush(self):
+        """Run all queued mutations, return a WriteSummary"""
+        with self._lock:
+            queues = list(self._queues.values())
+            self._queues = {}
+        summary = WriteSummary()
+        if not queues:
+            return summary
+        if self.dry_run:
+            for queue in queues:
+                for pending, *_ in queue:
+                    self.logger.info(f"Would {pending.description}")
+                    summary.planned.append(pending)
+            summary.log(self.logger)
+            return summary
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for results in pool.map(self._run_queue, queues):
+                for pending in results:
+                    if pending.done:
+                        summary.succeeded.append(pending)
+                    elif pending.skipped:
+                        summary.skipped.append(pending)
+                    else:
+                        summary.failed.append(pending)
+        summary.log(self.logger)
+        return summary
+
+    @staticmethod
+    def _resolve(value):
+        if isinstance(value, Pending):
+            return value.result
+        return value
+
+    def _run_queue(self, queue):
+        failed = None
+        for pending, func, args, kwargs in queue:
+            if failed:
+                pending.error = f"earlier change failed: {failed.description}"
+                pending.skipped = True
+                continue
+            args = [self._resolve(arg) for arg in args]
+            kwargs = {name: self._resolve(value) for name, value in kwargs.items()}
+            try:
+                pending.result = self._call(func, args, kwargs)
+                pending.done = True
+            except Exception as error:
+                pending.error = error
+                failed = pending
+        return [pending for pending, *_ in queue]
+
+    def _call(self, func, args, kwargs):
+        attempt = 0
+        while True:
+            for bucket in self.buckets:
+                bucket.acquire()
+            try:
+                return func(*args, **kwargs)
+            except Exception as error:
+                if status_code(error) != 429 or attempt >= self.RETRIES:
+                    raise
+                delay = self.BACKOFF * 2**attempt
+                self.logger.warn(f"Rate limited, retrying in {delay}s")
+                for bucket in self.buckets:
+                    bucket.pause(delay)
+                attempt += 1
@@ -0,0 +1,106 @@
+"""Attachment graph between cards."""
+
+
+class CardGraph:
+    """Directed graph from each card to the cards it attaches
+
+    Edges that close a cycle are found with one depth first search in insertion
+    order and left out of every traversal, so results do not depend on the order
+    cards are visited in.
+    """
+
+    def __init__(self, edges):
+        self._edges = {}
+        for node, children in edges.items():
+            unique = []
+            for child in children:
+                if child != node and child not in unique:
+                    unique.append(child)
+            self._edges[node] = unique
+        for children in list(self._edges.values()):
+            for child in children:
+                self._edges.setdefault(child, [])
+        self.back_edges = set()
+        self.cycles = []
+        self._order = []
+        self._search()
+
+    @property
+    def nodes(self):
+        return self._edges.keys()
+
+    def children(self, node):
+        """Attached nodes of node, without edges that close a cycle"""
+        return [
+            child
+            for child in self._edges.get(node, [])
+            if (node, child) not in self.back_edges
+        ]
+
+    def reaching(self, targets):
+        """Return every node with a path to one of targets, targets included
+
+        Cycle edges are followed too, a cycle reaches whatever any of its cards
+        reach.
+        """
+        parents = {}
+        for node, children in self._edges.items():
+            for child in children:
+                parents.setdefault(child, []).append(node)
+        found = set(targets)
+        queue = list(found)
+        while queue:
+            node = queue.pop()
+            for parent in parents.get(node, []):
+                if parent not in found:
+                    found.add(parent)
+                    queue.append(parent)
+        return found
+
+    def _search(self):
+        """Find back edges and a post order of the graph"""
+        state = {}  # node -> 1 on the current path, 2 when finished
+        for root in self._edges:
+            if root in state:
+                continue
+            path = [root]
+            stack = [(root, iter(self._edges[root]))]
+            state[root] = 1
+            while stack:
+                node, children = stack[-1]
+                for child in children:
+                    if state.get(child) == 1:
+                        self.back_edges.add((node, child))
+                        self.cycles.append(path[path.index(child) :] + [child])
+                    elif child not in state:
+                        state[child] = 1
+                        path.append(child)
+                        stack.append((child, iter(self._edges[child])))
+                        break
+                else:
+                    stack.pop()
+                    path.pop()
+                    state[node] = 2
+                    self._order.append(node)
+
+    def rollup(self, values, depth=1):
+        """Sum values over attached nodes up to depth levels, None for no limit
+
+        Each level is computed once for every node, so shared sub-graphs are
+        not walked again for each parent.
+        """
+        if depth is None:
+            totals = {}
+            for node in self._order:
+                totals[node] = values.get(node, 0) + sum(
+                    totals[child] for child in self.children(node)
+                )
+            return totals
+        totals = {node: values.get(node, 0) for node in self._edges}
+        for _ in range(depth):
+            totals = {
+                node: values.get(node, 0)
+                + sum(totals[child] for child in self.children(node))
+                for node in self._edges
+            }
+        return totals
@@ -1,7 +1,13 @@
+import re
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from operator import attrgetter
+from urllib.parse import urlsplit, urlunsplit
 
 
 from jira import JIRA
+from roadmap.executor import Pending, WriteExecutor, WriteSummary
 from roadmap.logging import Logger
 
 
@@ -37,8 +43,200 @@ class Fields:
     SPRINT = "customfield_10020"
 
 
+def normalize_url(url):
+    """Url with scheme and host lower cased, no fragment or trailing slash"""
+    parts = urlsplit(url.strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(),
+                       parts.path.rstrip("/"), parts.query, ""))
+
+
+class IssueRecord:
+    """Fields of an issue from a projected search
+
+    Only FIELDS are requested, writes go through the underlying issue.
+    """
+
+    FIELDS = [
+        "summary",
+        "labels",
+        "status",
+        "issuetype",
+        Fields.EPIC_LINK,
+        Fields.EPIC_NAME,
+        Fields.STORY_POINT,
+    ]
+    __slots__ = ("id", "key", "summary", "labels", "status", "issue_type",
+                 "epic_link", "epic_name", "story_points", "_issue")
+
+    def __init__(self, issue):
+        fields = issue.raw.get("fields", {})
+        self._issue = issue
+        self.id = issue.id
+        self.key = issue.key
+        self.summary = fields.get("summary")
+        self.labels = fields.get("labels") or []
+        self.status = (fields.get("status") or {}).get("name")
+        self.issue_type = (fields.get("issuetype") or {}).get("name")
+        self.epic_link = fields.get(Fields.EPIC_LINK)
+        self.epic_name = fields.get(Fields.EPIC_NAME)
+        self.story_points = fields.get(Fields.STORY_POINT)
+
+    @classmethod
+    def created(cls, issue, fields):
+        """Record of an issue created from fields, without fetching it"""
+        record = cls(issue)
+        record.summary = fields.get("summary")
+        record.labels = fields.get("labels", [])
+        record.issue_type = fields.get("issuetype", {}).get("name")
+        record.epic_link = fields.get(Fields.EPIC_LINK)
+        record.epic_name = fields.get(Fields.EPIC_NAME)
+        record.story_points = fields.get(Fields.STORY_POINT)
+        return record
+
+    def update(self, fields):
+        """Update the issue and the record"""
+        self._issue.update(fields)
+        self.summary = fields.get("summary", self.summary)
+        self.labels = fields.get("labels", self.labels)
+        self.epic_link = fields.get(Fields.EPIC_LINK, self.epic_link)
+        self.epic_name = fields.get(Fields.EPIC_NAME, self.epic_name)
+        self.story_points = fields.get(Fields.STORY_POINT, self.story_points)
+        if "status" in fields:
+            self.status = fields["status"]["name"]
+
+    def __repr__(self):
+        return f"<IssueRecord {self.key}: {self.summary}>"
+
+
+class IssueIndex:
+    """Issues by normalized summary and by key, in search order"""
+
+    def __init__(self, issues=()):
+        self._by_summary = {}
+        self._by_key = {}
+        for issue in issues:
+            self.add(issue)
+
+    @staticmethod
+    def normalize(summary):
+        """Summary with case and runs of whitespace ignored"""
+        return " ".join((summary or "").split()).casefold()
+
+    def add(self, issue):
+        self._by_summary.setdefault(self.normalize(issue.summary), []).append(issue)
+        self._by_key[issue.key] = issue
+
+    def by_summary(self, summary, issue_type=None):
+        """Return the first issue with summary, of issue_type if given, or None"""
+        for issue in self.all_by_summary(summary):
+            if issue_type is None or issue.issue_type == issue_type:
+                return issue
+        return None
+
+    def all_by_summary(self, summary):
+        return list(self._by_summary.get(self.normalize(summary), []))
+
+    def by_key(self, key):
+        return self._by_key.get(key)
+
+    def __contains__(self, summary):
+        return self.normalize(summary) in self._by_summary
+
+    def __iter__(self):
+        return iter(self._by_key.values())
+
+    def __len__(self):
+        return len(self._by_key)
+
+
+class IssueMatcher:
+    """Resolve free text, such as a trello card slug, to one of issues
+
+    Text is reduced to lower case alphanumeric tokens, so brackets and other
+    punctuation never matter. Candidates share trigrams with the text and are
+    scored by the Dice coefficient of the two trigram sets, an identical token
+    sequence scores 1. Ties are broken by issue key so results are stable.
+    """
+
+    MIN_SCORE = 0.6
+    # Candidates scoring within this of the best make a match ambiguous
+    AMBIGUITY = 0.05
+
+    def __init__(self, issues):
+        self._issues = []
+        self._tokens = {}
+        self._trigrams = {}
+        for issue in issues:
+            tokens = self.tokens(issue.summary)
+            self._issues.append((issue, tokens, self.trigrams(tokens)))
+            self._tokens.setdefault(tokens, []).append(len(self._issues) - 1)
+            for trigram in self._issues[-1][2]:
+                self._trigrams.setdefault(trigram, []).append(len(self._issues) - 1)
+
+    @staticmethod
+    def tokens(text):
+        return tuple(re.findall(r"[a-z0-9]+", (text or "").lower()))
+
+    @staticmethod
+    def trigrams(tokens):
+        text = f" {' '.join(tokens)} "
+        return {text[i : i + 3] for i in range(len(text) - 2)}
+
+    def _exact(self, text):
+        """Issues whose summary has the same tokens as text"""
+        positions = self._tokens.get(self.tokens(text), [])
+        return [self._issues[position][0] for position in positions]
+
+    def candidates(self, text):
+        """Return (score, issue) pairs for text, best first"""
+        tokens = self.tokens(text)
+        if not tokens:
+            return []
+        exact = set(self._tokens.get(tokens, []))
+        query = self.trigrams(tokens)
+        shared = Counter()
+        for trigram in query:
+            for position in self._trigrams.get(trigram, []):
+                shared[position] += 1
+        scored = []
+        for position, count in shared.items():
+            issue, _, trigrams = self._issues[position]
+            if position in exact:
+                score = 1.0
+            else:
+                score = 2 * count / (len(query) + len(trigrams))
+            scored.append((score, issue))
+        scored.sort(key=lambda match: (-match[0], match[1].key))
+        return scored
+
+    def resolve(self, text):
+        """Return (issue, candidates)
+
+        An identical token sequence wins on its own. Otherwise issue is None when
+        no candidate scores MIN_SCORE, or when more than one scores within
+        AMBIGUITY of the best, candidates are those considered.
+        """
+        matches = [match for match in self.candidates(text)
+                   if match[0] >= self.MIN_SCORE]
+        if not matches:
+            return None, []
+        identical = self._exact(text)
+        exact = [match for match in matches if match[1] in identical]
+        if exact:
+            return (exact[0][1] if len(exact) == 1 else None), exact
+        close = [match for match in matches
+                 if match[0] >= matches[0][0] - self.AMBIGUITY]
+        if len(close) > 1:
+            return None, close
+        return matches[0][1], close
+
+
 class Project:
     INCLUDE_LABELS = ["21.10"]
+    PAGE_SIZE = 100
+    # Most issues the bulk create endpoint accepts in one request
+    CREATE_BATCH_SIZE = 50
+    UPDATE_WORKERS = 8
 
     def __init__(self, server, api_key, email, project, dry_run=False):
         self._jira = JIRA(server,
@@ -48,16 +246,58 @@ class Project:
         self.board = self._jira.boards(projectKeyOrID=project)[0]
         self.logger = Logger()
         self.dry_run = dry_run
+        self._all_issues = None
+        self._issue_index = None
+        self._matchers = {}
+        self._links = {}
+        self._links_lock = threading.Lock()
 
     @property
     def all_issues(self):
         if self._all_issues is None:
-            self._all_issues = self.search()
+            self._all_issues = list(self.iter_issues())
         return self._all_issues
 
-    def search(self, jql="", sort="", sanitize=True):
-        """Perofrm a JQL search on the project"""
+    @property
+    def issue_index(self):
+        """Index of all_issues, issues created by this project are added to it"""
+        if self._issue_index is None:
+            self._issue_index = IssueIndex(self.all_issues)
+        return self._issue_index
+
+    def matcher(self, issue_type):
+        """IssueMatcher over the indexed issues of issue_type"""
+        if issue_type not in self._matchers:
+            self._matchers[issue_type] = IssueMatcher(
+                issue for issue in self.issue_index if issue.issue_type == issue_type
+            )
+        return self._matchers[issue_type]
 
+    def search(self, jql="", sort="", sanitize=True):
+        """Perofrm a JQL search on the project, return every matching IssueRecord"""
+        return list(self.iter_issues(jql, sort))
+
+    def iter_issues(self, jql="", sort="", fields=None, page_size=None):
+        """Yield an IssueRecord for every issue matching jql, a page at a time
+
+        Only fields, IssueRecord.FIELDS by default, are requested.
+        """
+        query = self._query(jql, sort)
+        fields = ",".join(fields or IssueRecord.FIELDS)
+        page_size = page_size or self.PAGE_SIZE
+        start = 0
+        while True:
+            page = self._jira.search_issues(query,
+                                            startAt=start,
+                                            maxResults=page_size,
+                                            fields=fields)
+            for issue in page:
+                yield IssueRecord(issue)
+            start += len(page)
+            if not len(page) or start >= page.total:
+                return
+
+    def _query(self, jql="", sort=""):
         query = [f"project={self._project}"]
 
         if jql:
@@ -70,11 +310,29 @@ class Project:
 
         query = " ".join(query)
         self.logger.debug(f"Performing Search: {query}")
-        return self._jira.search_issues(query)
+        return query
 
     def links(self, issue):
-        """Find all links for on a given issue."""
-        return {link.raw["object"]["url"] for link in self._jira.remote_links(issue)}
+        """Normalized urls of the remote links on a given issue, fetched once."""
+        with self._links_lock:
+            links = self._links.get(issue.id)
+        if links is None:
+            links = {normalize_url(link.raw["object"]["url"])
+                     for link in self._jira.remote_links(issue.key)}
+            with self._links_lock:
+                links = self._links.setdefault(issue.id, links)
+        return links
+
+    def prefetch_links(self, issues):
+        """Fetch the remote links of every issue not cached yet, concurrently"""
+        with self._links_lock:
+            missing = {issue.id: issue for issue in issues
+                       if issue and issue.id not in self._links}
+        if not missing:
+            return
+        self.logger.debug(f"Fetching remote links for {len(missing)} issues")
+        with ThreadPoolExecutor(max_workers=self.UPDATE_WORKERS) as pool:
+            list(pool.map(self.links, missing.values()))
 
     def sprint(self, state):
         """Return the most recent sprint of the given state, or None."""
@@ -105,32 +363,57 @@ class Project:
         if not active_sprint:
             self.logger.error(f"No active sprint for {self._project}")
             return
-        issues = {task.fields.summary: task
-                  for task in self.search(f"labels = {Labels.EXT_PR}")}
+        issues = self.issue_index
+        writes = self.executor()
+        links = []
+        creates = []
         for pr in prs:
             jira_title = f"{pr.title} ({pr.repo_name} #{pr.number})"
             labels = self._build_labels(pr)
-            if issue := issues.get(jira_title):
+            issue = next((task for task in issues.all_by_summary(jira_title)
+                          if Labels.EXT_PR in task.labels), None)
+            if issue:
                 self.logger.debug(f"Found existing issue {issue.key}: {jira_title}")
-                if issue.fields.status.name in {Lanes.REVIEW, Lanes.DONE}:
-                    self.move_to_lane(issue, Lanes.TODO)
-                    self.add_comment(issue, f"Needs review: {pr.reason}")
-                self.ensure_labels(issue, labels)
+                if issue.status in {Lanes.REVIEW, Lanes.DONE}:
+                    writes.submit(issue.key, self.move_to_lane, issue, Lanes.TODO,
+                                  description=f"move {issue.key} to {Lanes.TODO}")
+                    writes.submit(issue.key, self.add_comment, issue,
+                                  f"Needs review: {pr.reason}",
+                                  description=f"comment on {issue.key}")
+                if set(labels) != set(issue.labels):
+                    writes.submit(issue.key, self.ensure_labels, issue, labels,
+                                  description=f"label {issue.key} {labels}")
+                links.append((issue, pr.url))
             else:
-                issue = self.create_issue({
+                creates.append((pr, {
                     "summary": jira_title,
                     "description": pr.body,
                     "labels": labels,
                     Fields.SPRINT: active_sprint.id,
                     "issuetype": {"name": IssueTypes.TASK},
-                })
-                self.add_comment(issue, f"Needs review: {pr.reason}")
-            self.ensure_link(issue, pr.url)
+                }))
+        writes.flush()
+        created = self.create_issues([fields for _, fields in creates])
+        for (pr, fields), pending in zip(creates, created):
+            if not (pending.done or self.dry_run):
+                continue
+            # issue is None in dry-run
+            writes.submit(pending.key, self.add_comment, pending.result,
+                          f"Needs review: {pr.reason}",
+                          description=f"comment on {fields['summary']}")
+            links.append((pending.result, pr.url))
+        writes.flush()
+        self.prefetch_links([issue for issue, _ in links])
+        for issue, url in links:
+            self.ensure_link(issue, url)
 
     def import_trello_issues(self, issues):
         """Create project issues given trello exports"""
         trello_issues = list(issues)
-        all_issues = self.search()
+        index = self.issue_index
+        updates = []
+        links = []
+        creates = {}
         # import pprint
 
         # for testissue in all_issues:
@@ -160,19 +443,27 @@ class Project:
                 fields["labels"] = labels
 
             # Update or create issue
-            jira_issue = None
-            for existing_issue in all_issues:
-                if existing_issue.fields.summary == issue.name:
-                    self.logger.debug(f"Updating existing issue: {issue.name}")
-                    existing_issue.update(fields)
-                    jira_issue = existing_issue
-                    break
+            jira_issue = index.by_summary(issue.name)
+            if jira_issue:
+                self.logger.debug(f"Updating existing issue: {issue.name}")
+                updates.append((jira_issue, fields))
+                links.append((jira_issue, issue))
+            elif IssueIndex.normalize(issue.name) in creates:
+                self.logger.debug(f"Skipping duplicate feature: {issue.name}")
             else:
                 # Create new issue
                 fields["issuetype"] = {"name": "Epic" if issue.epic else "Story"}
-                jira_issue = self.create_issue(fields)
-
-            # Add links
+                creates[IssueIndex.normalize(issue.name)] = (issue, fields)
+        self.update_issues(updates)
+        created = self.create_issues([fields for _, fields in creates.values()])
+        for (issue, _), pending in zip(creates.values(), created):
+            if pending.done or self.dry_run:
+                # issue is None in dry-run
+                links.append((pending.result, issue))
+
+        # Add links
+        self.prefetch_links([jira_issue for jira_issue, _ in links])
+        for jira_issue, issue in links:
             for attachment in issue.attachments:
                 if not attachment.url:
                     # No attachement
@@ -183,71 +474,139 @@ class Project:
                     continue
                 self.ensure_link(jira_issue, attachment.url)
 
-        self._link_trello_epics(epics=[issue for issue in issues if issue.epic])
+        self._link_trello_epics(epics=[issue for issue in trello_issues if issue.epic])
+
+    @staticmethod
+    def _card_slug(url):
+        """Title words of a trello card url, empty for short urls"""
+        slug = url.rstrip("/").split("/")[-1]
+        return " ".join(slug.split("-")[1:])
+
+    def _resolve(self, issue_type, text):
+        """Return the issue of issue_type matching text, or None, logging why"""
+        issue, candidates = self.matcher(issue_type).resolve(text)
+        if issue:
+            return issue
+        if candidates:
+            found = ", ".join(f"{match.key} ({score:.2f})"
+                              for score, match in candidates)
+            self.logger.error(f"Ambiguous {issue_type} for {text}: {found}")
+        else:
+            self.logger.error(f"No {issue_type} found for {text}")
+        return None
 
     def _link_trello_epics(self, epics):
+        """Link the stories attached to trello epics to their jira epics"""
+        epic_stories = {}
         for epic in epics:
             self.logger.debug(f"Adding links for epic: {epic.name}")
-            epic_name = epic.name.replace("[", "")
-            epic_name = epic_name.replace("]", "")
-            jira_epics = self.search(jql=f'type="Epic" AND summary ~ "{epic_name}"')
-            if jira_epics.total != 1:
-                self.logger.error(
-                    f"Found {jira_epics.total} epics "
-                    f"instead of 1 searching for {epic.name} "
-                    "Skipping linking this epic"
-                )
+            jira_epic = self.issue_index.by_summary(epic.name, IssueTypes.EPIC)
+            if not jira_epic:
+                jira_epic = self._resolve(IssueTypes.EPIC, epic.name)
+            if not jira_epic:
+                self.logger.error(f"Skipping linking epic {epic.name}")
                 continue
-            else:
-                epic_key = jira_epics[0].key
 
             # Process attachments
             for attachment in epic.attachments:
                 if not attachment.url.startswith("https://trello.com/c/"):
                     self.logger.debug(f"Skipping {attachment} not a trello card")
                     continue
-                title_text = " ".join(attachment.url.split("-")[1:])
-                # These are illegal in search text, only dealing with the ones I have
-                title_text = title_text.replace("[", "")
-                title_text = title_text.replace("]", "")
-                jira_issues = self.search(
-                    jql=f'type="Story" AND summary ~ "{title_text}"'
-                )
-                if jira_issues.total != 1:
-                    self.logger.error(
-                        f"Found {jira_issues.total} issues "
-                        f"instead of 1 searching for {title_text} "
-                        "Skipping linking this attachment"
-                    )
+                title_text = self._card_slug(attachment.url)
+                if not title_text:
+                    self.logger.debug(f"Skipping {attachment.url} without a title")
                     continue
-                else:
-                    jira_issue = jira_issues[0]
-
-                fields = {Fields.EPIC_LINK: epic_key}
-                jira_issue.update(fields)
-                self.logger.info(f"Added {epic_key} to {jira_issue}")
-
-    def create_issue(self, fields):
-        """Create an issue with the provided fields"""
+                jira_issue = self._resolve(IssueTypes.STORY, title_text)
+                if not jira_issue:
+                    self.logger.error(f"Skipping linking {attachment.url}")
+                    continue
+                if jira_issue.epic_link == jira_epic.key:
+                    continue
+                epic_stories.setdefault(jira_epic.key, []).append(jira_issue)
+        self.add_issues_to_epics(epic_stories)
+
+    def add_issues_to_epics(self, epic_issues):
+        """Link issues to epics, given as {epic key: [issues]}, concurrently
+
+        The agile add_issues_to_epic call needs the greenhopper API, so each
+        issue gets its epic link field set instead.
+        """
+        self.update_issues([(issue, {Fields.EPIC_LINK: epic_key})
+                            for epic_key, issues in epic_issues.items()
+                            for issue in issues])
+
+    def executor(self):
+        """Return a write executor for issue updates, only logging in dry run"""
+        return WriteExecutor(workers=self.UPDATE_WORKERS, dry_run=self.dry_run)
+
+    def _add_created(self, issue):
+        """Add a created issue to the issue cache and index"""
+        self.logger.debug(f"Created issue {issue.key}: {issue.summary}")
+        if self._issue_index is not None:
+            self._issue_index.add(issue)
+            self._matchers = {}
+        if self._all_issues is not None:
+            self._all_issues.append(issue)
+
+    def create_issues(self, field_list):
+        """Create issues through the bulk endpoint, CREATE_BATCH_SIZE per request
+
+        Returns a Pending per fields in order, the result of a created issue is
+        its IssueRecord.
+        """
+        summary = WriteSummary()
+        results = []
+        for fields in field_list:
+            fields["project"] = {"key": self._project}
+            results.append(Pending(fields["summary"],
+                                   f"create issue {fields['summary']}"))
         if self.dry_run:
-            self.logger.debug(f"Would create issue: {fields['summary']}")
-            return
-        self.logger.debug(f"Creating issue: {fields['summary']}")
-        fields["project"] = {"key": self._project}
-        issue = self._jira.create_issue(fields=fields)
-        self.logger.debug(f"Created issue {issue.key}: {issue.fields.summary}")
-        return issue
+            for pending in results:
+                self.logger.debug(f"Would {pending.description}")
+                summary.planned.append(pending)
+            summary.log(self.logger)
+            return results
+        for i in range(0, len(field_list), self.CREATE_BATCH_SIZE):
+            chunk = field_list[i : i + self.CREATE_BATCH_SIZE]
+            pending_chunk = results[i : i + self.CREATE_BATCH_SIZE]
+            try:
+                created = self._jira.create_issues(field_list=chunk, prefetch=False)
+            except Exception as error:
+                for pending in pending_chunk:
+                    pending.error = error
+                    summary.failed.append(pending)
+                continue
+            for fields, pending, result in zip(chunk, pending_chunk, created):
+                if result["status"] == "Success":
+                    pending.result = IssueRecord.created(result["issue"], fields)
+                    pending.done = True
+                    self._add_created(pending.result)
+                    summary.succeeded.append(pending)
+                else:
+                    pending.error = result["error"]
+                    summary.failed.append(pending)
+        summary.log(self.logger)
+        return results
+
+    def update_issues(self, updates):
+        """Apply (issue, fields) updates concurrently, return a Pending per update"""
+        writes = self.executor()
+        results = [writes.submit(issue.key, issue.update, fields,
+                                 description=f"update {issue.key}")
+                   for issue, fields in updates]
+        writes.flush()
+        return results
 
     def ensure_labels(self, issue, labels):
         """Update an existing issue with the provided fields"""
-        if set(labels) == set(issue.fields.labels):
+        if set(labels) == set(issue.labels):
             return
         if self.dry_run:
             self.logger.debug(f"Would update labels {issue.key}:"
-                              f" {issue.fields.labels} -> {labels}")
+                              f" {issue.labels} -> {labels}")
             return
         self.logger.debug(f"Updating issue {issue.key}:"
-                          f" {issue.fields.labels} -> {labels}")
+                          f" {issue.labels} -> {labels}")
         issue.update({"labels": labels})
 
     def move_to_lane(self, issue, lane):
@@ -266,11 +625,12 @@ class Project:
             self.logger.debug(f"Would add comment to {issue_key}: {comment}")
             return
         self.logger.debug(f"Adding comment to {issue.key}: {comment}")
-        self._jira.add_comment(issue, comment, is_internal=True)
+        self._jira.add_comment(issue.key, comment, is_internal=True)
 
     def ensure_link(self, issue, url):
         """Add a link to an issue."""
-        if issue and url in self.links(issue):  # issue might be None in dry-run
+        # issue might be None in dry-run
+        if issue and normalize_url(url) in self.links(issue):
             self.logger.debug(f"Link already on issue {issue.key}: {url}")
             return
         if self.dry_run:
@@ -280,3 +640,5 @@ class Project:
             return
         self.logger.debug(f"Adding link to issue {issue.key}: {url}")
         self._jira.add_simple_link(issue.id, {"title": url, "url": url})
+        with self._links_lock:
+            self._links[issue.id].add(normalize_url(url))
@@ -0,0 +1,44 @@
+"""Pooled HTTP session with request counters."""
+import threading
+from collections import Counter
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class PooledSession(requests.Session):
+    """Keep-alive session with a sized connection pool and a default timeout
+
+    Counts every request by method and by API resource, e.g. "GET boards".
+    """
+
+    def __init__(self, pool_size=16, timeout=30, api_prefix="/1/"):
+        super().__init__()
+        self.timeout = timeout
+        self.api_prefix = api_prefix
+        self.counts = Counter()
+        self._lock = threading.Lock()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, method, url, *args, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        with self._lock:
+            self.counts[f"{method.upper()} {self._resource(url)}"] += 1
+        return super().request(method, url, *args, **kwargs)
+
+    def _resource(self, url):
+        path = urlparse(url).path
+        if path.startswith(self.api_prefix):
+            path = path[len(self.api_prefix) :]
+        return path.strip("/").split("/")[0]
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def summary(self):
+        counts = ", ".join(f"{key}: {n}" for key, n in self.counts.most_common())
+        return f"{self.total} requests ({counts})"
@@ -0,0 +1,71 @@
+"""Stale card handling across team boards."""
+import datetime
+
+from roadmap.logging import Logger
+
+
+class StaleCardEngine:
+    """Label and move stale cards of every team's scrum board in one pass
+
+    Cards in the in-progress lists of a scrum board that have been inactive for
+    longer than label_delta get the stale label. Those inactive for longer than
+    move_delta that already carried the stale label before this run are moved
+    to the inactive list of the team's backlog board. All writes are queued on
+    one executor and flushed together.
+    """
+
+    INACTIVE_LIST = "Backlog"
+
+    def __init__(
+        self,
+        label_delta=datetime.timedelta(days=5),
+        move_delta=datetime.timedelta(days=10),
+    ):
+        self.label_delta = label_delta
+        self.move_delta = move_delta
+        self.logger = Logger()
+        self._teams = []
+
+    def add_team(self, team, scrum_board, backlog_board):
+        self._teams.append((team, scrum_board, backlog_board))
+
+    def run(self):
+        """Queue and flush every label and move, return the WriteSummary"""
+        if not self._teams:
+            return None
+        writes = self._teams[0][1].executor()
+        moves = []
+        now = datetime.datetime.now(datetime.timezone.utc)
+        delta = min(self.label_delta, self.move_delta)
+        for team, scrum_board, backlog_board in self._teams:
+            for card in scrum_board.get_stale_cards(
+                scrum_board.IN_PROGRESS_LISTS, delta
+            ):
+                inactive = now - card.date_last_activity
+                # Only cards labelled by an earlier run are moved, the label is
+                # the warning
+                stale = scrum_board.is_stale(card)
+                if inactive > self.label_delta and not stale:
+                    self.logger.info(f"Labeling stale card: {team}:{card.name}")
+                    scrum_board.label_card(
+                        card,
+                        scrum_board.stale_label,
+                        writes,
+                        description=f"label {team}:{card.name} stale",
+                    )
+                if inactive > self.move_delta and stale:
+                    self.logger.info(f"Moving inactive card: {team}:{card.name}")
+                    pending = scrum_board.move_card(
+                        card,
+                        backlog_board,
+                        self.INACTIVE_LIST,
+                        writes,
+                        description=f"move {team}:{card.name} to {backlog_board.name}",
+                    )
+                    moves.append((pending, scrum_board, backlog_board))
+        summary = writes.flush()
+        for pending, scrum_board, backlog_board in moves:
+            if pending.done:
+                scrum_board.invalidate_cards({pending.key})
+                backlog_board.invalidate_cards()
+        return summary
@@ -1,7 +1,546 @@
 import datetime
+import threading
 
+from trello.board import Board
+from trello.card import Card
+from trello.customfield import CustomFieldDefinition
+from trello.label import Label
+from trello.trellolist import List
+
+from roadmap.executor import Pending, TokenBucket, WriteExecutor
+from roadmap.graph import CardGraph
 from roadmap.logging import Logger
 
+# Trello allows 300 requests per 10 seconds per API key and 100 per token
+KEY_RATE_LIMIT = (300, 10)
+TOKEN_RATE_LIMIT = (100, 10)
+_rate_limit_buckets = {}
+_rate_limit_lock = threading.Lock()
+# Resolved boards, (kind, short_id or lower case name) -> (board id, board name)
+_board_ids = {}
+
+
+def rate_limit_buckets(client):
+    """Token buckets shared by everything using client's API key and token"""
+    token = getattr(client, "resource_owner_key", None) or client.api_secret
+    keys = (("key", client.api_key, KEY_RATE_LIMIT), ("token", token, TOKEN_RATE_LIMIT))
+    buckets = []
+    with _rate_limit_lock:
+        for kind, value, limit in keys:
+            if (kind, value) not in _rate_limit_buckets:
+                _rate_limit_buckets[(kind, value)] = TokenBucket(*limit)
+            buckets.append(_rate_limit_buckets[(kind, value)])
+    return buckets
+
+
+class CardIndex:
+    """Constant time card lookups by name, url, short url and id
+
+    Built once per card snapshot, when names are repeated the first card in
+    board order wins.
+    """
+
+    def __init__(self, cards=None):
+        self._by_name = {}
+        self._by_url = {}
+        self._by_short_link = {}
+        self._by_id = {}
+        for card in cards or []:
+            self.add(card)
+
+    @staticmethod
+    def short_link(url):
+        """Return the short link of a trello card url, or None"""
+        if not url or "trello.com/c/" not in url:
+            return None
+        return url.split("trello.com/c/", 1)[1].split("/", 1)[0] or None
+
+    def add(self, card):
+        self._by_name.setdefault(card.name, card)
+        self._by_id[card.id] = card
+        for url in (card.url, getattr(card, "shortUrl", None)):
+            if not url:
+                continue
+            self._by_url[url] = card
+            short_link = self.short_link(url)
+            if short_link:
+                self._by_short_link[short_link] = card
+
+    def by_name(self, name):
+        """Return the first card named name, or None"""
+        return self._by_name.get(name)
+
+    def by_url(self, url):
+        """Return the card for a full or short card url, or None"""
+        if not url:
+            return None
+        card = self._by_url.get(url)
+        if card:
+            return card
+        return self._by_short_link.get(self.short_link(url))
+
+    def by_id(self, card_id):
+        return self._by_id.get(card_id)
+
+    def __contains__(self, name):
+        return name in self._by_name
+
+    def __len__(self):
+        return len(self._by_id)
+
+
+class SharedCardIndex:
+    """Card lookups by name and url across every board opened in a process
+
+    Registered boards are searched through the card index of their loaded
+    snapshot, a lookup never fetches a board. Boards with SHARE_CARDS unset can
+    look up cards but are never searched.
+    """
+
+    def __init__(self):
+        self._boards = []
+        self._lock = threading.Lock()
+
+    def register(self, board):
+        with self._lock:
+            if board not in self._boards:
+                self._boards.append(board)
+
+    def _indexes(self, exclude=None):
+        with self._lock:
+            boards = [
+                board
+                for board in self._boards
+                if board is not exclude and board.SHARE_CARDS
+            ]
+        for board in boards:
+            index = board.loaded_card_index()
+            if index is not None:
+                yield board, index
+
+    def find(self, name, exclude=None):
+        """Return (board, card) for the first card named name, or (None, None)"""
+        for board, index in self._indexes(exclude):
+            card = index.by_name(name)
+            if card:
+                return board, card
+        return None, None
+
+    def by_url(self, url, exclude=None):
+        """Return the card for a full or short card url on any board, or None"""
+        for _, index in self._indexes(exclude):
+            card = index.by_url(url)
+            if card:
+                return card
+        return None
+
+
+class BoardRegistry:
+    """Lists, labels and custom field definitions of a board indexed for lookups
+
+    Lists and custom fields are keyed by name, lists also by id, and labels by
+    (name, color) and by name. The first entry wins when names are repeated.
+    """
+
+    def __init__(self, lists=None, labels=None, custom_fields=None):
+        self._lists_by_name = {}
+        self._lists_by_id = {}
+        self._labels = {}
+        self._labels_by_name = {}
+        self._labels_by_id = {}
+        self._custom_fields = {}
+        self._custom_fields_by_id = {}
+        for lst in lists or []:
+            self.add_list(lst)
+        for label in labels or []:
+            self.add_label(label)
+        for field in custom_fields or []:
+            self.add_custom_field(field)
+
+    def add_list(self, lst):
+        self._lists_by_name.setdefault(lst.name, lst)
+        self._lists_by_id[lst.id] = lst
+
+    def add_label(self, label):
+        self._labels.setdefault((label.name, label.color), label)
+        self._labels_by_name.setdefault(label.name, []).append(label)
+        self._labels_by_id[label.id] = label
+
+    def add_custom_field(self, field):
+        self._custom_fields.setdefault(field.name, field)
+        self._custom_fields_by_id[field.id] = field
+
+    def list(self, name):
+        return self._lists_by_name.get(name)
+
+    def list_by_id(self, list_id):
+        return self._lists_by_id.get(list_id)
+
+    def list_names(self):
+        """Map of list id to list name"""
+        return {list_id: lst.name for list_id, lst in self._lists_by_id.items()}
+
+    def label(self, name, color):
+        return self._labels.get((name, color))
+
+    def labels_named(self, name):
+        return list(self._labels_by_name.get(name, []))
+
+    def label_by_id(self, label_id):
+        return self._labels_by_id.get(label_id)
+
+    def custom_field(self, name):
+        return self._custom_fields.get(name)
+
+    def custom_field_by_id(self, field_id):
+        return self._custom_fields_by_id.get(field_id)
+
+
+class CardRecord:
+    """Lightweight card holding only the requested fields
+
+    Labels and custom field definitions are shared with the board registry
+    rather than copied into every card.
+    """
+
+    FIELDS = [
+        "name",
+        "desc",
+        "closed",
+        "idList",
+        "idLabels",
+        "url",
+        "shortUrl",
+        "dateLastActivity",
+    ]
+    __slots__ = (
+        "id",
+        "name",
+        "desc",
+        "closed",
+        "list_id",
+        "url",
+        "shortUrl",
+        "labels",
+        "custom_fields",
+        "date_last_activity",
+        "checklists",
+        "_attachments",
+        "_client",
+    )
+
+    def __init__(self, json_obj, registry, client=None):
+        self._client = client
+        self.id = json_obj["id"]
+        self.name = json_obj.get("name")
+        self.desc = json_obj.get("desc", "")
+        self.closed = json_obj.get("closed")
+        self.list_id = json_obj.get("idList")
+        self.url = json_obj.get("url")
+        self.shortUrl = json_obj.get("shortUrl")
+        self.labels = [
+            registry.label_by_id(label_id)
+            for label_id in json_obj.get("idLabels", [])
+            if registry.label_by_id(label_id)
+        ]
+        self.custom_fields = []
+        for item in json_obj.get("customFieldItems", []):
+            definition = registry.custom_field_by_id(item.get("idCustomField"))
+            if definition:
+                value = BoardSnapshot._field_value(item, definition)
+                self.custom_fields.append(CustomFieldValue(definition, value))
+        last_activity = json_obj.get("dateLastActivity")
+        self.date_last_activity = (
+            datetime.datetime.fromisoformat(last_activity.replace("Z", "+00:00"))
+            if last_activity
+            else None
+        )
+        self._attachments = json_obj.get("attachments")
+        # Checklists are not part of the record
+        self.checklists = []
+
+    @property
+    def description(self):
+        return self.desc
+
+    @property
+    def attachments(self):
+        """Attachment json of the card, fetched on first access if not loaded"""
+        if self._attachments is None:
+            self._attachments = self._client.fetch_json(
+                f"/cards/{self.id}/attachments"
+            )
+        return self._attachments
+
+    def __repr__(self):
+        return f"<CardRecord {self.name}>"
+
+
+class CustomFieldValue:
+    """Local custom field item written through to a cached card"""
+
+    def __init__(self, definition, value):
+        self.id = definition.id
+        self.name = definition.name
+        self.value = value
+
+    def __repr__(self):
+        return f"{self.name}:{self.value}"
+
+
+class Attachment:
+    """Attribute access to an attachment json object"""
+
+    def __init__(self, json_obj):
+        self.id = json_obj.get("id")
+        self.name = json_obj.get("name")
+        self.url = json_obj.get("url")
+        self.is_upload = json_obj.get("isUpload", False)
+
+    def __repr__(self):
+        return f"<Attachment {self.name}:{self.url}>"
+
+
+def card_attachments(card):
+    """Return the attachments of card, fetched at most once per card"""
+    return [Attachment(attachment) for attachment in card.attachments or []]
+
+
+class Checklist:
+    """Checklist from a board snapshot, items match py-trello's checklist items"""
+
+    def __init__(self, json_obj):
+        self.id = json_obj["id"]
+        self.name = json_obj.get("name")
+        self.card_id = json_obj.get("idCard")
+        self.items = [
+            dict(item, checked=item.get("state") == "complete")
+            for item in sorted(json_obj.get("checkItems", []), key=lambda x: x["pos"])
+        ]
+
+
+class ChecklistIndex:
+    """Checklists of a board by card id, with the cards that have a checked item"""
+
+    def __init__(self, checklists):
+        self._by_card = {}
+        self._checked = set()
+        for json_obj in checklists:
+            checklist = Checklist(json_obj)
+            self._by_card.setdefault(checklist.card_id, []).append(checklist)
+            if any(item["checked"] for item in checklist.items):
+                self._checked.add(checklist.card_id)
+
+    def by_card(self, card_id):
+        return self._by_card.get(card_id, [])
+
+    def has_checked(self, card_id):
+        return card_id in self._checked
+
+    def __len__(self):
+        return sum(len(checklists) for checklists in self._by_card.values())
+
+
+class BoardSnapshot:
+    """Cards, lists, labels, custom fields, attachments and checklists of a board
+
+    Everything is loaded with one nested board request and cards are built with
+    their attachments, custom field values and checklists already set, so reading
+    them does not cost a request per card.
+    """
+
+    # Most labels fetched per board, every release adds labels to a board
+    LABELS_LIMIT = 1000
+
+    def __init__(self, board, data):
+        self.data = data
+        self.custom_fields = [
+            CustomFieldDefinition.from_json(board, cf)
+            for cf in data.get("customFields", [])
+        ]
+        self.lists = [List.from_json(board, lst) for lst in data.get("lists", [])]
+        self.labels = [Label.from_json(board, lbl) for lbl in data.get("labels", [])]
+        self.checklists = ChecklistIndex(data.get("checklists", []))
+        definitions = {cf.id: cf for cf in self.custom_fields}
+        self.cards = [
+            self._build_card(board, card, definitions, self.checklists)
+            for card in data.get("cards", [])
+        ]
+
+    @staticmethod
+    def query(card_filter="visible"):
+        """Query parameters for the nested board request"""
+        return {
+            "fields": "name,url,shortUrl",
+            "actions": "all",
+            "actions_limit": 1,
+            "cards": card_filter,
+            "card_attachments": "true",
+            "card_customFieldItems": "true",
+            "checklists": "all",
+            "lists": "all",
+            "labels": "all",
+            "labels_limit": BoardSnapshot.LABELS_LIMIT,
+            "customFields": "true",
+        }
+
+    @classmethod
+    def fetch(cls, board, card_filter="visible"):
+        data = board.client.fetch_json(
+            f"/boards/{board.id}", query_params=cls.query(card_filter)
+        )
+        return cls(board, data)
+
+    @staticmethod
+    def _field_value(item, definition):
+        if item.get("idValue"):
+            options = getattr(definition, "list_options", None) or {}
+            return options.get(item["idValue"], item["idValue"])
+        value = item.get("value") or {}
+        return next(iter(value.values()), None)
+
+    def _build_card(self, board, card_json, definitions, checklists):
+        card_json = dict(card_json)
+        items = card_json.pop("customFieldItems", [])
+        card = Card.from_json(board, card_json)
+        card.customFields = []
+        for item in items:
+            definition = definitions.get(item.get("idCustomField"))
+            if definition:
+                value = self._field_value(item, definition)
+                card.customFields.append(CustomFieldValue(definition, value))
+        card._attachments = card_json.get("attachments", [])
+        card._checklists = checklists.by_card(card.id)
+        return card
+
+
+def custom_field_item(field, value):
+    """Custom field item json setting field to value"""
+    if field.field_type == "list":
+        options = getattr(field, "list_options", None) or {}
+        ids = {option: option_id for option_id, option in options.items()}
+        return {"idCustomField": field.id, "idValue": ids.get(value, value)}
+    if field.field_type == "checkbox":
+        checked = "true" if value else "false"
+        return {"idCustomField": field.id, "value": {"checked": checked}}
+    return {"idCustomField": field.id, "value": {field.field_type: str(value)}}
+
+
+class CardWrites:
+    """Changes queued for one card"""
+
+    def __init__(self, card):
+        self.card = card
+        self.fields = {}
+        self.custom_fields = {}
+        self.labels = {}
+        self.attachments = {}
+
+
+class WriteBuffer:
+    """Changes collected per card during a sync and flushed as the fewest calls
+
+    Card fields are sent with one PUT, the last value set for a card field or
+    custom field wins, and repeated labels and attachments are sent once. Cards
+    are keyed by id, or by the key of a card created through the buffer, so the
+    queued changes run after the card exists.
+    """
+
+    CARD_FIELDS = {"desc", "name", "closed"}
+
+    def __init__(self, board):
+        self.board = board
+        self.writes = board.executor()
+        self._cards = {}
+
+    @staticmethod
+    def _key(card):
+        return card.key if isinstance(card, Pending) else card.id
+
+    def _entry(self, card):
+        key = self._key(card)
+        if key not in self._cards:
+            self._cards[key] = CardWrites(card)
+        return self._cards[key]
+
+    def create_card(self, key, lst, **kwargs):
+        """Queue creating a card, return a Pending usable as a card in this buffer
+
+        The card is created when the buffer is flushed, before the changes
+        queued for it.
+        """
+        description = f"create card {kwargs.get('name', key)}"
+        return self.writes.submit(
+            key, self.board._create_card, lst, description=description, **kwargs
+        )
+
+    def update(self, card, **fields):
+        unknown = set(fields) - self.CARD_FIELDS
+        if unknown:
+            raise ValueError(f"Unsupported card fields: {', '.join(unknown)}")
+        self._entry(card).fields.update(fields)
+
+    def set_description(self, card, description):
+        self.update(card, desc=description)
+
+    def set_custom_field(self, card, value, field):
+        self._entry(card).custom_fields[field.id] = (field, value)
+
+    def add_label(self, card, label):
+        self._entry(card).labels[label.id] = label
+
+    def attach(self, card, url, name=None):
+        self._entry(card).attachments.setdefault(url, name)
+
+    def pending_value(self, card, field):
+        """Value queued for field on card, None if nothing is queued"""
+        entry = self._cards.get(self._key(card))
+        if entry and field.id in entry.custom_fields:
+            return entry.custom_fields[field.id][1]
+        return None
+
+    def flush(self):
+        """Send every queued change, return the WriteSummary"""
+        board = self.board
+        for key, entry in self._cards.items():
+            card = entry.card
+            name = getattr(card, "name", key)
+            if entry.fields:
+                self.writes.submit(
+                    key,
+                    board._update_card,
+                    card,
+                    description=f"update {', '.join(entry.fields)} on {name}",
+                    **entry.fields,
+                )
+            if entry.custom_fields:
+                self.writes.submit(
+                    key,
+                    board._set_custom_fields,
+                    card,
+                    list(entry.custom_fields.values()),
+                    description=f"set custom fields on {name}",
+                )
+            for label in entry.labels.values():
+                self.writes.submit(
+                    key,
+                    board._add_label,
+                    card,
+                    label,
+                    description=f"label {name} {label.name}",
+                )
+            for url, attachment_name in entry.attachments.items():
+                self.writes.submit(
+                    key,
+                    board._attach,
+                    card,
+                    url,
+                    name=attachment_name,
+                    description=f"attach {url} to {name}",
+                )
+        self._cards = {}
+        return self.writes.flush()
+
 
 class TrelloBoard:
     STORY_POINTS_FIELD = "sp"
@@ -13,18 +552,45 @@ class TrelloBoard:
     FEEDBACK_LABEL_COLOR = "purple"
     FEEDBACK_LABEL_NAME = "feedback"
     LISTS = []
+    CARD_CACHE_TTL = datetime.timedelta(minutes=10)
+    WRITE_WORKERS = 8
+    EPIC_ROLLUP_DEPTH = 1
+    BATCH_SIZE = 10
+    # Cards of this board can be found from other boards
+    SHARE_CARDS = True
 
-    def __init__(self, client, name=None, short_id=None):
-        if not name and not id:
+    def __init__(
+        self,
+        client,
+        name=None,
+        short_id=None,
+        cache=None,
+        dry_run=False,
+        shared_index=None,
+    ):
+        if not name and not short_id:
             raise ValueError("Either a board name or short_id must be provided")
         self.short_id = short_id
         self.id = None
         self.name = name
         self._client = client
+        self._cache = cache
+        self.dry_run = dry_run
+        self.shared_index = shared_index
+        if shared_index is not None:
+            shared_index.register(self)
+        self._resolved_board = None
         self._lists = None
         self._labels = None
+        self._registry = None
         self._cards = None
         self._visible_cards = None
+        self._card_index = None
+        self._card_graph = None
+        self._all_cards_by_id = None
+        self._checklists = None
+        self._cards_loaded_at = None
+        self._cache_lock = threading.RLock()
         self._custom_fields = None
         self._epics = []
         self._epic_label = None
@@ -34,16 +600,35 @@ class TrelloBoard:
 
     @property
     def _board(self):
+        if self._resolved_board:
+            return self._resolved_board
+        if self.short_id:
+            key = ("short_id", self.short_id)
+        else:
+            key = ("name", self.name.lower())
+        resolved = _board_ids.get(key)
+        if not resolved and self._cache:
+            resolved = self._cache.get_board_id(*key)
+        if resolved:
+            board_id, name = resolved
+            board = Board(client=self._client, board_id=board_id, name=name)
+        else:
+            board = self._find_board()
+            if self._cache:
+                self._cache.put_board_id(*key, board.id, board.name)
+        _board_ids[key] = (board.id, board.name)
+        self.name = board.name
+        self.id = board.id
+        self._resolved_board = board
+        return board
+
+    def _find_board(self):
         if self.short_id:
-            board = self._client.get_board(self.short_id)
-            self.name = board.name
-            self.id = board.id
-            return board
+            return self._client.get_board(self.short_id)
 
         all_boards = self._client.list_boards()
         for board in all_boards:
             if board.name.lower() == self.name.lower():
-                self.id = board.id
                 return board
         raise ValueError(f"Board {self.name} not in {all_boards}")
 
@@ -51,15 +636,10 @@ class TrelloBoard:
     def stale_label(self):
         if self._stale_label:
             return self._stale_label
-        try:
-            self._stale_label = next(
-                filter(
-                    lambda x: x.name == self.STALE_LABEL_NAME
-                    and x.color == self.STALE_LABEL_COLOR,
-                    self.labels,
-                )
-            )
-        except StopIteration:
+        self._stale_label = self.registry.label(
+            self.STALE_LABEL_NAME, self.STALE_LABEL_COLOR
+        )
+        if not self._stale_label:
             raise ValueError(
                 f"Label {self.STALE_LABEL_NAME}" f" not found on {self._board.name}."
             )
@@ -77,7 +657,7 @@ class TrelloBoard:
     def labels(self):
         if self._labels:
             return self._labels
-        self._labels = self._board.get_labels(limit=100)
+        self._labels = self._board.get_labels(limit=BoardSnapshot.LABELS_LIMIT)
         return self._labels
 
     @property
@@ -87,18 +667,62 @@ class TrelloBoard:
         visible = cards that are not archived and on an list that isn't archived
         open = unarchived cards on archived lists
         """
-        if self._cards:
+        self._expire_card_cache()
+        if self._cards is not None:
             return self._cards
-        self._cards = self._board.all_cards()
+        self._cards = self._load_snapshot("all").cards
+        self._all_cards_by_id = None
+        self._mark_card_cache()
         return self._cards
 
     @property
     def visible_cards(self):
-        if self._visible_cards:
+        self._expire_card_cache()
+        if self._visible_cards is not None:
             return self._visible_cards
-        self._visible_cards = self._board.visible_cards()
+        self._visible_cards = self._load_snapshot("visible").cards
+        self._card_index = None
+        self._card_graph = None
+        self._mark_card_cache()
         return self._visible_cards
 
+    @property
+    def card_index(self):
+        """Index of visible cards by name, url and id"""
+        if self._card_index is not None:
+            return self._card_index
+        self._card_index = CardIndex(self.visible_cards)
+        return self._card_index
+
+    def loaded_card_index(self):
+        """Card index of the loaded snapshot, None when no snapshot is loaded"""
+        with self._cache_lock:
+            if self._visible_cards is None:
+                return None
+            if self._card_index is None:
+                self._card_index = CardIndex(self._visible_cards)
+            return self._card_index
+
+    @property
+    def card_graph(self):
+        """Graph of visible cards to the visible cards they attach"""
+        if self._card_graph is not None:
+            return self._card_graph
+        edges = {}
+        for card in self.visible_cards:
+            edges[card.id] = []
+            for attachment in card_attachments(card):
+                if attachment.is_upload or not attachment.url:
+                    continue
+                subcard = self.card_index.by_url(attachment.url)
+                if subcard:
+                    edges[card.id].append(subcard.id)
+        self._card_graph = CardGraph(edges)
+        for cycle in self._card_graph.cycles:
+            names = [self.card_index.by_id(card_id).name for card_id in cycle]
+            self.logger.warn(f"Attachment cycle on {self.name}: {' -> '.join(names)}")
+        return self._card_graph
+
     @property
     def epics(self):
         """Return all cards with the epic label"""
@@ -118,20 +742,263 @@ class TrelloBoard:
     def feedback_label(self):
         if self._feedback_label:
             return self._feedback_label
-        self._feedback_label = next(
-            filter(
-                lambda x: x.name == self.FEEDBACK_LABEL_NAME
-                and x.color == self.FEEDBACK_LABEL_COLOR,
-                self.labels,
-            )
+        self._feedback_label = self.registry.label(
+            self.FEEDBACK_LABEL_NAME, self.FEEDBACK_LABEL_COLOR
         )
+        if not self._feedback_label:
+            raise StopIteration(f"Label {self.FEEDBACK_LABEL_NAME} not found")
         return self._feedback_label
 
+    def _load_snapshot(self, card_filter):
+        """Load cards with their board metadata in a single request"""
+        self.logger.debug(f"Loading {card_filter} cards snapshot for {self.name}")
+        board = self._board
+        if self._cache:
+            data = self._cache.board_data(
+                self._client, board.id, card_filter, BoardSnapshot.query(card_filter)
+            )
+            snapshot = BoardSnapshot(board, data)
+        else:
+            snapshot = BoardSnapshot.fetch(board, card_filter)
+        if self._lists is None:
+            self._lists = snapshot.lists
+        if self._labels is None:
+            self._labels = snapshot.labels
+        if self._custom_fields is None:
+            self._custom_fields = snapshot.custom_fields
+        if self._checklists is None:
+            self._checklists = snapshot.checklists
+        return snapshot
+
+    @property
+    def checklists(self):
+        """Every checklist on the board, loaded with one request"""
+        with self._cache_lock:
+            self._expire_card_cache()
+            if self._checklists is None:
+                self.logger.debug(f"Loading checklists for {self.name}")
+                self._checklists = ChecklistIndex(
+                    self._client.fetch_json(
+                        f"/boards/{self._board.id}/checklists",
+                        query_params={
+                            "fields": "idCard,name",
+                            "checkItem_fields": "name,state,pos",
+                        },
+                    )
+                )
+                self._mark_card_cache()
+            return self._checklists
+
     def _clear_card_cache(self):
-        """Clear caches"""
+        """Clear caches, the next card access refetches the board"""
         self._visible_cards = None
+        self._card_index = None
+        self._card_graph = None
         self._cards = None
+        self._all_cards_by_id = None
+        self._checklists = None
         self._epics = None
+        self._cards_loaded_at = None
+
+    def _mark_card_cache(self):
+        if self._cards_loaded_at is None:
+            self._cards_loaded_at = datetime.datetime.now()
+
+    def _expire_card_cache(self):
+        """Drop the card snapshot once it is older than CARD_CACHE_TTL"""
+        if self._cards_loaded_at is None:
+            return
+        if datetime.datetime.now() - self._cards_loaded_at > self.CARD_CACHE_TTL:
+            self.logger.debug(f"Card cache expired for {self.name}")
+            self._clear_card_cache()
+
+    def executor(self):
+        """Return a write executor sharing this client's rate limits"""
+        return WriteExecutor(
+            workers=self.WRITE_WORKERS,
+            buckets=rate_limit_buckets(self._client),
+            dry_run=self.dry_run,
+        )
+
+    def _cached_copies(self, card):
+        """Return card and every cached snapshot copy of it"""
+        copies = [card]
+        if self._visible_cards is not None:
+            copies.append(self.card_index.by_id(card.id))
+        if self._cards is not None:
+            if self._all_cards_by_id is None:
+                self._all_cards_by_id = {c.id: c for c in self._cards}
+            copies.append(self._all_cards_by_id.get(card.id))
+        unique = {}
+        for copy in copies:
+            if copy is not None:
+                unique[id(copy)] = copy
+        return list(unique.values())
+
+    def _add_label(self, card, label):
+        """Label card and write the label through to the card cache"""
+        self._client.fetch_json(
+            f"/cards/{card.id}/idLabels",
+            http_method="POST",
+            post_args={"value": label.id},
+        )
+        with self._cache_lock:
+            for copy in self._cached_copies(card):
+                # labels is a read only property on py-trello cards
+                attr = "_labels" if isinstance(copy, Card) else "labels"
+                labels = list(getattr(copy, attr, None) or [])
+                if label.id not in [lbl.id for lbl in labels]:
+                    labels.append(label)
+                    setattr(copy, attr, labels)
+            if label.name == self.EPIC_LABEL_NAME:
+                self._epics = None
+
+    def _set_custom_field(self, card, value, field):
+        """Set a custom field and write the value through to the card cache"""
+        card.set_custom_field(str(value), field)
+        self._cache_custom_field(card, value, field)
+
+    def _set_custom_fields(self, card, items):
+        """Set (field, value) items with one request when there are several"""
+        if len(items) == 1:
+            field, value = items[0]
+            return self._set_custom_field(card, value, field)
+        self._client.fetch_json(
+            f"/cards/{card.id}/customFields",
+            http_method="PUT",
+            post_args={
+                "customFieldItems": [
+                    custom_field_item(field, value) for field, value in items
+                ]
+            },
+        )
+        for field, value in items:
+            self._cache_custom_field(card, value, field)
+
+    def _cache_custom_field(self, card, value, field):
+        with self._cache_lock:
+            for copy in self._cached_copies(card):
+                fields = copy.custom_fields
+                for i, existing in enumerate(fields):
+                    if existing.name == field.name:
+                        fields[i] = CustomFieldValue(field, str(value))
+                        break
+                else:
+                    fields.append(CustomFieldValue(field, str(value)))
+
+    def _update_card(self, card, **fields):
+        """Update card fields with one request and write them through"""
+        self._client.fetch_json(
+            f"/cards/{card.id}", http_method="PUT", post_args=fields
+        )
+        with self._cache_lock:
+            for copy in self._cached_copies(card):
+                for name, value in fields.items():
+                    setattr(copy, name, value)
+            if "name" in fields:
+                self._card_index = None
+
+    def write_buffer(self):
+        """Return a WriteBuffer flushing through this board's executor"""
+        return WriteBuffer(self)
+
+    def _attach(self, card, url, name=None):
+        """Attach a url and write the attachment through to the card cache"""
+        if name:
+            attachment = card.attach(name=name, url=url)
+        else:
+            attachment = card.attach(url=url)
+        if not isinstance(attachment, dict):
+            attachment = {"name": name or url, "url": url}
+        with self._cache_lock:
+            for copy in self._cached_copies(card):
+                existing = getattr(copy, "_attachments", None)
+                if existing is None:
+                    continue
+                if not attachment.get("id") or attachment["id"] not in [
+                    a.get("id") for a in existing
+                ]:
+                    existing.append(attachment)
+            self._card_graph = None
+        return attachment
+
+    def _remove_attachment(self, card, attachment_id):
+        """Remove an attachment and drop it from the card cache"""
+        card.remove_attachment(attachment_id)
+        with self._cache_lock:
+            for copy in self._cached_copies(card):
+                if getattr(copy, "_attachments", None) is not None:
+                    copy._attachments = [
+                        a for a in copy._attachments if a.get("id") != attachment_id
+                    ]
+            self._card_graph = None
+
+    def _create_card(self, lst, **kwargs):
+        """Create a card on lst and add it to the card cache"""
+        card = lst.add_card(**kwargs)
+        # A new card has no attachments or custom field values yet, set them so
+        # later writes are recorded instead of refetched
+        card._attachments = []
+        card.customFields = []
+        with self._cache_lock:
+            if self._visible_cards is not None:
+                self._visible_cards.append(card)
+                if self._card_index is not None:
+                    self._card_index.add(card)
+                self._card_graph = None
+            if self._cards is not None:
+                self._cards.append(card)
+                if self._all_cards_by_id is not None:
+                    self._all_cards_by_id[card.id] = card
+            self._epics = None
+        return card
+
+    def _delete_card(self, card):
+        """Delete a card and drop it from the card cache"""
+        card.delete()
+        self._drop_cached_cards({card.id})
+
+    def _drop_cached_cards(self, card_ids, visible_only=False):
+        """Remove cards from the card cache in one pass"""
+        with self._cache_lock:
+            if self._visible_cards is not None:
+                self._visible_cards = [
+                    c for c in self._visible_cards if c.id not in card_ids
+                ]
+                self._card_index = None
+                self._card_graph = None
+            if self._cards is not None and not visible_only:
+                self._cards = [c for c in self._cards if c.id not in card_ids]
+                self._all_cards_by_id = None
+            self._epics = None
+
+    @property
+    def registry(self):
+        """Lists, labels and custom fields indexed by name"""
+        if self._registry is not None:
+            return self._registry
+        self._registry = BoardRegistry(self.lists, self.labels, self.custom_fields)
+        return self._registry
+
+    def _list(self, name):
+        lst = self.registry.list(name)
+        if not lst:
+            raise ValueError(f"List {name} not found on {self.name}.")
+        return lst
+
+    def _add_board_label(self, name, color):
+        """Create a label and add it to the label cache and registry"""
+        label = self._board.add_label(name, color)
+        self.labels.append(label)
+        self.registry.add_label(label)
+        return label
+
+    def _add_board_list(self, name, pos=None):
+        """Create a list and add it to the list cache and registry"""
+        lst = self._board.add_list(name, pos)
+        self.lists.append(lst)
+        self.registry.add_list(lst)
+        return lst
 
     @property
     def custom_fields(self):
@@ -143,11 +1010,8 @@ class TrelloBoard:
     @property
     def sp_field(self):
         """Return the custom story point field"""
-        try:
-            sp = next(
-                filter(lambda x: x.name == self.STORY_POINTS_FIELD, self.custom_fields)
-            )
-        except StopIteration:
+        sp = self.registry.custom_field(self.STORY_POINTS_FIELD)
+        if not sp:
             raise ValueError(
                 f"Custom Field {self.STORY_POINTS_FIELD}"
                 f" not found on {self._board.name}."
@@ -158,15 +1022,10 @@ class TrelloBoard:
     def epic_label(self):
         if self._epic_label:
             return self._epic_label
-        try:
-            self._epic_label = next(
-                filter(
-                    lambda x: x.name == self.EPIC_LABEL_NAME
-                    and x.color == self.EPIC_LABEL_COLOR,
-                    self.labels,
-                )
-            )
-        except StopIteration:
+        self._epic_label = self.registry.label(
+            self.EPIC_LABEL_NAME, self.EPIC_LABEL_COLOR
+        )
+        if not self._epic_label:
             raise ValueError(
                 f"Label {self.EPIC_LABEL_NAME}" f" not found on {self._board.name}."
             )
@@ -178,80 +1037,118 @@ class TrelloBoard:
         try:
             epic_label = self.epic_label  # noqa: F841
         except ValueError:
-            self._board.add_label(self.EPIC_LABEL_NAME, self.EPIC_LABEL_COLOR)
-            self._labels = None  # clear cache
+            self._add_board_label(self.EPIC_LABEL_NAME, self.EPIC_LABEL_COLOR)
 
         # Add stale label
         try:
             stale_label = self.stale_label  # noqa: F841
         except ValueError:
-            self._board.add_label(self.STALE_LABEL_NAME, self.STALE_LABEL_COLOR)
-            self._labels = None  # clear cache
+            self._add_board_label(self.STALE_LABEL_NAME, self.STALE_LABEL_COLOR)
 
         # Add feedback label
         try:
             feedback_label = self.feedback_label  # noqa: F841
         except StopIteration:
-            self._board.add_label(self.FEEDBACK_LABEL_NAME, self.FEEDBACK_LABEL_COLOR)
-            self._labels = None  # clear cache
+            self._add_board_label(self.FEEDBACK_LABEL_NAME, self.FEEDBACK_LABEL_COLOR)
 
         # Add any lists in self.LISTS
-        new_list = False
         for list in self.LISTS:
-            try:
-                next(filter(lambda x: x.name == list, self.lists))
-            except StopIteration:
-                self._board.add_list(list)
-                new_list = True
-        if new_list:
-            self._lists = None  # clear cache
+            if not self.registry.list(list):
+                self._add_board_list(list)
 
     def get_stale_cards(self, lists, delta=datetime.timedelta(days=10)):
-        stale_cards = []
+        """Cards in lists without activity for longer than delta
+
+        The loaded card snapshot is used when there is one, otherwise only the
+        requested lists are fetched.
+        """
         now = datetime.datetime.now(datetime.timezone.utc)
-        for card in self.visible_cards:
-            for list in self.lists:
-                if list.id == card.list_id:
-                    list_name = list.name
-            if list_name not in lists:
-                # Only processes requetsed lists
-                continue
+        if self._visible_cards is not None:
+            list_ids = {lst.id for lst in map(self.registry.list, lists) if lst}
+            cards = (c for c in self.visible_cards if c.list_id in list_ids)
+        else:
+            cards = self.iter_list_cards(lists)
+        stale_cards = []
+        for card in cards:
             if now - card.date_last_activity > delta:
                 self.logger.debug(f"Delta: {now - card.date_last_activity}")
                 stale_cards.append(card)
         return stale_cards
 
+    def is_stale(self, card):
+        """True if card carries the stale label"""
+        return any(
+            label.name == self.STALE_LABEL_NAME
+            and label.color == self.STALE_LABEL_COLOR
+            for label in card.labels or []
+        )
+
     def label_stale_cards(self, lists, delta=datetime.timedelta(days=5)):
-        stale_cards = self.get_stale_cards(lists, delta)
-        for card in stale_cards:
-            try:
-                next(
-                    filter(
-                        lambda x: x.name == self.STALE_LABEL_NAME
-                        and x.color == self.STALE_LABEL_COLOR,
-                        card.labels,
-                    )
-                )
-                # Already labeled
+        writes = self.executor()
+        for card in self.get_stale_cards(lists, delta):
+            if self.is_stale(card):
                 self.logger.debug(f"Found existing lable, skipping {card.name}")
-            except (StopIteration, TypeError):
-                # No lables, or no stale label
-                card.add_label(self.stale_label)
-                self._clear_card_cache()
-                self.logger.info(f"Labeling Stale Card: {card.name}")
+                continue
+            self.logger.info(f"Labeling Stale Card: {card.name}")
+            self.label_card(
+                card, self.stale_label, writes, description=f"label {card.name} stale"
+            )
+        return writes.flush()
+
+    def label_card(self, card, label, writes, description=None):
+        """Queue labelling card on writes, return the Pending"""
+        return writes.submit(
+            card.id,
+            self._add_label,
+            card,
+            label,
+            description=description or f"label {card.name} {label.name}",
+        )
+
+    def move_card(self, card, board, list_name, writes, description=None):
+        """Queue moving card to the named list on another board, return the
+        Pending
 
-    def update_sizes(self, sized_features=[]):
+        Neither board's card cache is updated, call invalidate_cards on both
+        once the move is done.
+        """
+        return writes.submit(
+            card.id,
+            self._move_card,
+            card,
+            board,
+            board._list(list_name),
+            description=description or f"move {card.name} to {board.name}",
+        )
+
+    def invalidate_cards(self, card_ids=None):
+        """Drop card_ids from the card cache, or the whole cache when None"""
+        if card_ids is None:
+            self._clear_card_cache()
+        else:
+            self._drop_cached_cards(card_ids)
+
+    def _move_card(self, card, board, lst):
+        """Move card to lst on another board"""
+        self._client.fetch_json(
+            f"/cards/{card.id}",
+            http_method="PUT",
+            post_args={"idBoard": board._board.id, "idList": lst.id},
+        )
+
+    def update_sizes(self, sized_features=[], depth=None):
         """Update story point field from sized_features
-        Sized Features will be updated as well as all epics on the board"""
+        Sized Features will be updated as well as all epics on the board, only
+        cards whose points change are written"""
+        writes = self.write_buffer()
+        points = {}
+        epics = {card.id: card for card in self.epics}
         for feature in sized_features:
             if not feature.story_points:
                 self.logger.warn(f"Features {feature.name} has no story points")
                 continue
-            try:
-                card = next(
-                    filter(lambda x: x.name == feature.name, self.visible_cards)
-                )
-            except StopIteration:
+            card = self.card_index.by_name(feature.name)
+            if not card:
                 # Feature doesn't have a card on this board
                 continue
             if feature.story_points == self.EPIC_POINTS:
@@ -266,45 +1163,73 @@ class TrelloBoard:
                     ]
                 ):
                     self.logger.debug(f"Labeling epic: {feature.name}")
-                    card.add_label(self.epic_label)
-                    self._clear_card_cache()
+                    writes.add_label(card, self.epic_label)
+                    epics[card.id] = card
                 # Zero score, calculated at the end
-                card.set_custom_field(str(0), self.sp_field)
-                self._clear_card_cache()
+                points[card.id] = 0
                 continue
-            card.set_custom_field(str(feature.story_points), self.sp_field)
-        for card in self.epics:
-            points = self._get_points(card)
-            card.set_custom_field(str(points), self.sp_field)
-            self._clear_card_cache()
-        self._clear_card_cache()
+            points[card.id] = feature.story_points
+            if feature.story_points != self._card_points(card):
+                writes.set_custom_field(card, feature.story_points, self.sp_field)
+        values = {card.id: self._card_points(card) for card in self.visible_cards}
+        values.update(points)
+        totals = self.card_graph.rollup(values, depth or self.EPIC_ROLLUP_DEPTH)
+        for card in epics.values():
+            queued = writes.pending_value(card, self.sp_field)
+            current = self._card_points(card) if queued is None else queued
+            if totals[card.id] == current:
+                continue
+            self.logger.debug(f"Setting epic {card.name} to {totals[card.id]}")
+            writes.set_custom_field(card, totals[card.id], self.sp_field)
+        return writes.flush()
+
+    def _card_points(self, card):
+        """Return the story points of card, 0 when unset"""
+        for field in card.custom_fields:
+            if field.name == self.STORY_POINTS_FIELD and field.value:
+                return int(field.value)
+        return 0
 
     def _url_from_name(self, name):
-        """Return the url for a card by name, if it is on this board"""
+        """Return the url for a card by name, on this board or any loaded board
+        sharing its index"""
         self.logger.debug(f"Searching for card: {name}")
-        for card in self.visible_cards:
-            if card.name == name:
-                self.logger.debug(f"Found card: {name}")
+        card = self.card_index.by_name(name)
+        if card:
+            self.logger.debug(f"Found card: {name}")
+            return card.url
+        if self.shared_index is not None:
+            board, card = self.shared_index.find(name, exclude=self)
+            if card:
+                self.logger.debug(f"Found card: {name} on {board.name}")
                 return card.url
         self.logger.debug(f"No url for card name: {name}")
-        self.logger.debug(f"Names: {[c.name for c in self.visible_cards]}")
         return None
 
+    def _card_from_url(self, url):
+        """Return the card for a url, on this board or any loaded board sharing
+        its index"""
+        card = self.card_index.by_url(url)
+        if card is None and self.shared_index is not None:
+            card = self.shared_index.by_url(url, exclude=self)
+        return card
+
     def update_features(self, features, new_list=None):
         """Update features on this board, if new_list is provided add new cards to that
         list, otherwise skip new cards"""
-        card_names = [card.name for card in self.visible_cards]
+        writes = self.write_buffer()
         for feature in features:
             self.logger.debug(f"Checking feature for import: {feature.name}")
-            if feature.name not in card_names:
+            if feature.name not in self.card_index:
                 # New card
                 if not new_list:
                     self.logger.debug(f"Skipping feature, not on board: {feature.name}")
                     continue
-                nlist = [lst for lst in self.lists if lst.name == new_list][0]
+                nlist = self._list(new_list)
                 self.logger.debug(f"Creating card in list: {nlist}")
-                card = nlist.add_card(name=feature.name, desc=feature.description)
-                self._clear_card_cache()
+                card = writes.create_card(
+                    feature.name, nlist, name=feature.name, desc=feature.description
+                )
                 for attachment in feature.attachments:
                     self.logger.debug(f"Checking Attachment: {attachment}")
                     if attachment.name:
@@ -312,21 +1237,16 @@ class TrelloBoard:
                         url = self._url_from_name(attachment.name)
                         if url:
                             self.logger.debug(f"Found card: {attachment.name}")
-                            card.attach(url=url)
-                            self._clear_card_cache()
+                            writes.attach(card, url=url)
                     elif attachment.url:
                         self.logger.debug(f"Attaching: {attachment.url}")
-                        card.attach(url=attachment.url)
-                        self._clear_card_cache()
+                        writes.attach(card, url=attachment.url)
             else:
                 # Existing card
-                card = [
-                    card for card in self.visible_cards if card.name == feature.name
-                ][0]
+                card = self.card_index.by_name(feature.name)
                 if card.description != feature.description:
                     self.logger.debug(f"Updating description on: {card.name}")
-                    card.set_description(feature.description)
-                    self._clear_card_cache()
+                    writes.set_description(card, feature.description)
                 if feature.attachments:
                     self.logger.debug(f"Checking attachments: {feature.name}")
                     existing = card.attachments
@@ -337,77 +1257,71 @@ class TrelloBoard:
                             url = attachment.url
                         if url and url not in [a["url"] for a in existing]:
                             self.logger.debug(f"Attaching {url} to {card.name}")
-                            card.attach(url=url)
-                            self._clear_card_cache()
+                            writes.attach(card, url=url)
+        return writes.flush()
 
     def add_card(self, name, description, list, points=0):
         """Add a card from name, descriptoin, and list."""
         self.logger.debug(f"Searching for list: {list}")
-        nlist = [lst for lst in self.lists if lst.name == list][0]
+        nlist = self._list(list)
         self.logger.debug(f"Creating card in list: {nlist}")
-        card = nlist.add_card(name=name, desc=description)
+        writes = self.write_buffer()
+        card = writes.create_card(name, nlist, name=name, desc=description)
         if points:
-            card.set_custom_field(str(points), self.STORY_POINTS_FIELD)
-        self._clear_card_cache()
-
-    def _get_points(self, card, skip_cards=None, depth=1):
-        """Recursively sum story points for card"""
-        if not skip_cards:
-            skip_cards = []
-        points = 0
-        currnet_depth = 1
-        for field in card.custom_fields:
-            if field.name == self.STORY_POINTS_FIELD:
-                points = int(field.value)
-        self.logger.debug(f"Getting points for: {card.name}")
-        self.logger.debug(f"skip_cards: {skip_cards}")
-        subpoints_list = []
-        if not currnet_depth > depth:
-            # Process attachments
-            for attachment in card.get_attachments():
-                if attachment.is_upload:
-                    self.logger.debug(f"Skipping upload")
-                    continue
-                if attachment.url in skip_cards:
-                    self.logger.debug(f"Skipping skip_card: {attachment.url}")
-                    continue
-                self.logger.debug(f"Searching: {attachment.url}")
-                try:
-                    subcard = next(
-                        filter(lambda x: x.url == attachment.url, self.visible_cards)
-                    )
-                except StopIteration:
-                    # Card not found on this board
-                    self.logger.debug(
-                        f"Attachment not card on this board board: {attachment.url}"
-                    )
-                    continue
-                skip_cards.append(card.url)
-                new_depth = depth - 1
-                subpoints = self._get_points(
-                    subcard, skip_cards=skip_cards, depth=new_depth
-                )
-                self.logger.debug(f"Subpoints for {card.name}: {subpoints}")
-                subpoints_list.append(subpoints)
-        self.logger.debug(f"Found points for: {card.name}")
-        if subpoints_list:
-            self.logger.debug(
-                f"Returning point results: subpoints: {sum(subpoints_list, points)}"
-            )
-            return sum(subpoints_list, points)
-        else:
-            self.logger.debug(f"Returning point results: {points}")
-            return points
+            writes.set_custom_field(card, points, self.sp_field)
+        return writes.flush()
 
-    def get_features(self, visible=True, attachments=False, skip=None):
-        features = []
+    def iter_cards(
+        self, card_filter="all", fields=None, attachments=False, page_size=1000
+    ):
+        """Yield CardRecords for the board, a page at a time
+
+        Pages are walked with the before cursor, so boards with more cards than
+        a single response allows are read completely in bounded memory.
+        """
+        query = {
+            "fields": ",".join(fields or CardRecord.FIELDS),
+            "customFieldItems": "true",
+            "limit": page_size,
+        }
+        if attachments:
+            query["attachments"] = "true"
+        path = f"/boards/{self._board.id}/cards/{card_filter}"
+        while True:
+            page = self._client.fetch_json(path, query_params=dict(query))
+            for card in page:
+                yield CardRecord(card, self.registry, self._client)
+            if len(page) < page_size:
+                return
+            query["before"] = min(card["id"] for card in page)
+
+    def iter_list_cards(self, lists, fields=None):
+        """Yield CardRecords of the visible cards in the named lists
+
+        Lists are fetched through the batch endpoint, BATCH_SIZE per request.
+        Commas separate the batched urls, so the field list is escaped.
+        """
+        fields = "%2C".join(fields or CardRecord.FIELDS)
+        query = f"fields={fields}&customFieldItems=true"
+        list_ids = [lst.id for lst in map(self.registry.list, lists) if lst]
+        for i in range(0, len(list_ids), self.BATCH_SIZE):
+            chunk = list_ids[i : i + self.BATCH_SIZE]
+            urls = ",".join(f"/lists/{list_id}/cards?{query}" for list_id in chunk)
+            responses = self._client.fetch_json("/batch", query_params={"urls": urls})
+            for response in responses:
+                for card in response.get("200", []):
+                    yield CardRecord(card, self.registry, self._client)
+
+    def iter_features(self, visible=True, attachments=False, skip=None):
+        """Yield features, all cards are streamed from iter_cards"""
         self.logger.debug(f"Getting features skip: {skip}")
         if visible:
             if skip:
                 cards = []
                 skip_ids = []
-                for list in self.lists:
-                    if list.name in skip:
+                for name in skip:
+                    list = self.registry.list(name)
+                    if list:
                         skip_ids.append(list.id)
                         self.logger.info(f"Skipping list: {list.name}")
                 for card in self.visible_cards:
@@ -416,18 +1330,45 @@ class TrelloBoard:
             else:
                 cards = self.visible_cards
         else:
-            cards = self.cards
+            cards = self.iter_cards("all", attachments=attachments)
+        sp_field = self.sp_field
         for card in cards:
-            features.append(
-                TrelloFeature(
-                    card=card,
-                    status=self._get_card_status(card),
-                    sp_field=self.sp_field,
-                    epic_name=self.EPIC_LABEL_NAME,
-                    attachments=attachments,
-                )
+            yield TrelloFeature(
+                card=card,
+                status=self._get_card_status(card),
+                sp_field=sp_field,
+                epic_name=self.EPIC_LABEL_NAME,
+                attachments=attachments,
             )
-        return features
+
+    def get_features(self, visible=True, attachments=False, skip=None):
+        return list(self.iter_features(visible, attachments, skip))
+
+    def load_attachments(self, features):
+        """Load attachments of features whose cards do not carry them
+
+        Missing attachments are fetched through the batch endpoint,
+        BATCH_SIZE cards per request, instead of one request per card.
+        """
+        missing = {}
+        for feature in features:
+            # Only features whose card did not carry attachments keep the card
+            if feature._attachments is None and feature._card is not None:
+                missing.setdefault(feature._card.id, []).append(feature)
+        card_ids = list(missing)
+        for i in range(0, len(card_ids), self.BATCH_SIZE):
+            chunk = card_ids[i : i + self.BATCH_SIZE]
+            urls = ",".join(f"/cards/{card_id}/attachments" for card_id in chunk)
+            responses = self._client.fetch_json("/batch", query_params={"urls": urls})
+            for card_id, response in zip(chunk, responses):
+                attachments = response.get("200", [])
+                for feature in missing[card_id]:
+                    # Keep the cached card in step so it is not fetched again
+                    feature._card._attachments = attachments
+                    feature._set_attachments(attachments)
+        for feature in features:
+            if feature._attachments is None:
+                feature._set_attachments()
 
     def _get_card_status(self, card):
         """Return a status for this card"""
@@ -435,23 +1376,57 @@ class TrelloBoard:
 
 
 class TrelloFeature:
+    """Feature record of a card
+
+    Name, status, story points, description and labels are copied up front.
+    Attachments are only converted the first time they are used, the card is
+    kept until then when it does not carry them and dropped afterwards, so
+    features do not pin whole cards in memory.
+    """
+
+    __slots__ = (
+        "name",
+        "status",
+        "release",
+        "story_points",
+        "closed",
+        "epic",
+        "description",
+        "labels",
+        "_card",
+        "_attachment_json",
+        "_attachments",
+    )
+
     def __init__(
         self, card, status, sp_field, release=None, epic_name="Epic", attachments=False
     ):
+        self._attachments = None
         self.name = card.name
-        self.description = card.description
         self.status = status
-        self.links = []
-        self.attachments = []
         self.release = release
         self.story_points = None
         self._set_story_points(card, sp_field)
-        self.labels = card.labels or []
         self.closed = card.closed
         self.epic = False
         self._check_epic(card, epic_name)
+        self.description = card.description
+        self.labels = card.labels or []
+        # Attachment json the card already carries, otherwise the card fetches it
+        self._attachment_json = getattr(card, "_attachments", None)
+        self._card = card if self._attachment_json is None else None
         if attachments:
-            self._set_attachments(card)
+            self._set_attachments()
+
+    @property
+    def attachments(self):
+        if self._attachments is None:
+            self._set_attachments()
+        return self._attachments
+
+    @property
+    def links(self):
+        return [attachment.url for attachment in self.attachments if attachment.url]
 
     def _check_epic(self, card, epic_name):
         if not card.labels:
@@ -461,11 +1436,16 @@ class TrelloFeature:
                 self.epic = True
                 return
 
-    def _set_attachments(self, card):
-        for attachment in card.get_attachments():
-            if attachment.url:
-                self.links.append(attachment.url)
-            self.attachments.append(attachment)
+    def _set_attachments(self, attachment_json=None):
+        """Convert the attachments and release the card and json"""
+        if attachment_json is not None:
+            self._attachment_json = attachment_json
+        if self._attachment_json is None:
+            self._attachments = card_attachments(self._card)
+        else:
+            self._attachments = [Attachment(a) for a in self._attachment_json]
+        self._card = None
+        self._attachment_json = None
 
     def _set_story_points(self, card, sp_field):
         for field in card.custom_fields:
@@ -477,6 +1457,9 @@ class TrelloFeature:
 
 
 class SizingBoard(TrelloBoard):
+    # Sizing cards are temporary copies of backlog and scrum cards
+    SHARE_CARDS = False
+
     def __init__(self, *args, sizes=[1, 2, 3, 5, 8, 13, 21], **kwargs):
         super().__init__(*args, **kwargs)
         self._sizes = sizes
@@ -486,37 +1469,76 @@ class SizingBoard(TrelloBoard):
         self.setup_lists()
 
     def setup_lists(self):
-        all_lists = self._board.all_lists()
-        list_names = [list.name for list in all_lists]
         desired_lists = ["Unsized"]
         desired_lists.extend([f"Size {n}" for n in self._sizes])
         desired_lists.append("Epic")
-        missing_lists = [name for name in desired_lists if name not in list_names]
+        missing_lists = [name for name in desired_lists if not self.registry.list(name)]
         for name in missing_lists:
-            self._board.add_list(name, pos="bottom")
-        self._lists = None
+            self._add_board_list(name, pos="bottom")
+
+    def _list_cards(self, lst):
+        """Cached visible cards on lst in board order"""
+        cards = [c for c in self.visible_cards if c.list_id == lst.id]
+        return sorted(cards, key=lambda c: c.pos)
 
     def clear_board(self):
-        for card in self.cards:
-            card.delete()
-            self._clear_card_cache()
+        """Delete every card on the board"""
+        return self._delete_cards(self.cards)
+
+    def _delete_cards(self, cards):
+        writes = self.executor()
+        for card in cards:
+            writes.submit(
+                card.id, self._delete_card, card, description=f"delete {card.name}"
+            )
+        return writes.flush()
+
+    def archive_list(self, name):
+        """Archive every card in the named list with one request"""
+        lst = self._list(name)
+        self.logger.debug(f"Archiving all cards in {lst}")
+        if self.dry_run:
+            self.logger.info(f"Would archive all cards in {lst.name}")
+            return
+        lst.archive_all_cards()
+        archived = {c.id for c in self._list_cards(lst)}
+        self._drop_cached_cards(archived, visible_only=True)
+
+    def move_list(self, name, destination):
+        """Move every card from the named list to the destination list"""
+        lst = self._list(name)
+        dest = self._list(destination)
+        self.logger.debug(f"Moving all cards from {lst} to {dest}")
+        if self.dry_run:
+            self.logger.info(f"Would move all cards from {lst.name} to {dest.name}")
+            return
+        lst.move_all_cards(dest)
+        with self._cache_lock:
+            moved = {c.id for c in self._list_cards(lst)}
+            for card in (self._visible_cards or []) + (self._cards or []):
+                if card.id in moved:
+                    card.idList = dest.id
+
+    def truncate_list(self, name, len=3):
+        """Delete the cards past the first len in the named list"""
+        lst = self._list(name)
+        self.logger.debug(f"Truncating {lst} to {len} cards")
+        return self._delete_cards(self._list_cards(lst)[len:])
 
     def truncate_lists(self, len=3):
         """Truncate size lists to max len"""
+        overflow = []
         for list in self.lists:
             if list.name == "Unsized":
                 # Don't truncate the unsized list
                 continue
             self.logger.debug(f"Truncating {list} to {len} cards")
-            for i, card in enumerate(list.list_cards_iter()):
-                if i < len:
-                    continue
-                card.delete()
-                self._clear_card_cache()
+            overflow.extend(self._list_cards(list)[len:])
+        return self._delete_cards(overflow)
 
     def add_feature_cards(self, features, update_description=False, update_links=True):
         """Add missing cards"""
-        card_names = [card.name for card in self.visible_cards]
+        writes = self.write_buffer()
         for feature in features:
             try:
                 if feature.status.state == feature.status.DONE:
@@ -525,7 +1547,7 @@ class SizingBoard(TrelloBoard):
             except AttributeError:
                 # No Scrum Status to check
                 pass
-            if feature.name not in card_names:
+            if feature.name not in self.card_index:
                 # New card
                 if feature.epic:
                     list_name = "Epic"
@@ -534,61 +1556,117 @@ class SizingBoard(TrelloBoard):
                 else:
                     list_name = f"Unsized"
                 self.logger.debug(f"Feature Size: {feature.story_points}")
-                slist = [lst for lst in self.lists if lst.name == list_name][0]
+                slist = self._list(list_name)
                 self.logger.debug(f"Found List: {slist}")
                 labels = []
                 for label in feature.labels:
                     if label.name == self.feedback_label.name:
                         labels = [self.feedback_label]
                         break
-                card = slist.add_card(
+                card = writes.create_card(
+                    feature.name,
+                    slist,
                     name=feature.name,
                     desc=feature.description,
                     labels=labels,
                 )
-                self._clear_card_cache
                 for link in feature.links:
-                    card.attach(url=link)
-                    self._clear_card_cache()
+                    writes.attach(card, url=link)
             elif update_description or update_links:
                 # Existing card
-                card = [
-                    card for card in self.visible_cards if card.name == feature.name
-                ][0]
+                card = self.card_index.by_name(feature.name)
                 if update_description and card.description != feature.description:
-                    card.set_description(feature.description)
-                    self._clear_card_cache()
+                    writes.set_description(card, feature.description)
                 if update_links and feature.links:
                     attachments = card.attachments
                     for link in feature.links:
                         if link not in [a["url"] for a in attachments]:
-                            card.attach(url=link)
-                            self._clear_card_cache()
-
-    def get_features(self, *args, **kwargs):
+                            writes.attach(card, url=link)
+        return writes.flush()
+
+    def plan_sizes(self):
+        """Return the changes that make story points and trello card attachment
+        names match the sizing lists"""
+        plan = []
+        # The snapshot also sets the lists, labels and custom fields, loading
+        # it first saves a request for each
+        cards = self.visible_cards
         for list in sorted(self.lists, key=lambda x: x.name, reverse=True):
-            if list.name == "Unsized":
+            if list.name == "Unsized" or list.name not in self.sized_lists:
                 continue
-            if list.name == "Epic":
-                points = self.EPIC_POINTS
-            else:
-                points = list.name.split(" ")[1]
-            for card in list.list_cards_iter():
-                self.logger.debug(f"Setting {self.sp_field} to {points} on {card.name}")
-                card.set_custom_field(str(points), self.sp_field)
-                self._clear_card_cache()
-                for attachment in card.get_attachments():
-                    if attachment.url.startswith("https://trello.com"):
-                        self.logger.debug(f"Checking for card: {attachment}")
-                        for subcard in self.visible_cards:
-                            if subcard.url == attachment.url:
-                                self.logger.debug(f"Adding name: {subcard.name}")
-                                card.remove_attachment(attachment.id)
-                                card.attach(name=subcard.name, url=subcard.url)
-                                self._clear_card_cache()
+            points = self.sized_lists[list.name]
+            for card in [c for c in cards if c.list_id == list.id]:
+                if self._card_points(card) != points:
+                    plan.append(
+                        PlannedChange(
+                            card,
+                            f"set {points} points on {card.name}",
+                            self._set_custom_field,
+                            card,
+                            points,
+                            self.sp_field,
+                        )
+                    )
+                for attachment in card_attachments(card):
+                    url = attachment.url or ""
+                    if not url.startswith("https://trello.com"):
+                        continue
+                    subcard = self._card_from_url(url)
+                    if subcard and attachment.name != subcard.name:
+                        plan.append(
+                            PlannedChange(
+                                card,
+                                f"rename attachment {url} on {card.name}"
+                                f" to {subcard.name}",
+                                self._rename_attachment,
+                                card,
+                                attachment,
+                                subcard,
+                            )
+                        )
+        return plan
+
+    @property
+    def sized_lists(self):
+        """Story points for each sizing list name"""
+        sizes = {f"Size {n}": n for n in self._sizes}
+        sizes["Epic"] = self.EPIC_POINTS
+        return sizes
+
+    def apply_plan(self, plan):
+        """Write a plan from plan_sizes, only logged in dry run mode"""
+        writes = self.executor()
+        for change in plan:
+            writes.submit(
+                change.card.id,
+                change.func,
+                *change.args,
+                description=change.description,
+            )
+        return writes.flush()
+
+    def _rename_attachment(self, card, attachment, subcard):
+        self._remove_attachment(card, attachment.id)
+        self._attach(card, name=subcard.name, url=subcard.url)
+
+    def get_features(self, *args, **kwargs):
+        self.apply_plan(self.plan_sizes())
         return super().get_features(*args, **kwargs)
 
 
+class PlannedChange:
+    """A card write computed by a plan, applied later"""
+
+    def __init__(self, card, description, func, *args):
+        self.card = card
+        self.description = description
+        self.func = func
+        self.args = args
+
+    def __repr__(self):
+        return self.description
+
+
 class BacklogBoard(TrelloBoard):
     FEEDBACK_LIST = "Product Feedback"
     LISTS = [
@@ -604,54 +1682,48 @@ class BacklogBoard(TrelloBoard):
     def feedback_list(self):
         if self._feedback_list:
             return self._feedback_list
-        self._feedback_list = [
-            lst for lst in self.lists if lst.name == self.FEEDBACK_LIST
-        ][0]
+        self._feedback_list = self._list(self.FEEDBACK_LIST)
         return self._feedback_list
 
     def add_feedback_cards(
         self, product_feedback, update_description=False, update_bugs=True
     ):
         """Add missing cards"""
-        card_names = [card.name for card in self.visible_cards]
+        writes = self.write_buffer()
         for feedback in product_feedback:
             self.logger.debug(f"Checking feedback: {feedback.name}")
-            if feedback.name not in card_names:
+            if feedback.name not in self.card_index:
                 # New card
                 self.logger.debug(f"Creating Card: {feedback.name}")
-                card = self.feedback_list.add_card(
+                card = writes.create_card(
+                    feedback.name,
+                    self.feedback_list,
                     name=feedback.name,
                     desc=feedback.description,
                     labels=[self.feedback_label],
                 )
                 for bug in feedback.bugs:
-                    card.attach(url=bug)
-                    self._clear_card_cache()
+                    writes.attach(card, url=bug)
                 if feedback.story_points:
-                    card.set_custom_field(str(feedback.story_points), self.sp_field)
+                    writes.set_custom_field(card, feedback.story_points, self.sp_field)
             elif update_description or update_bugs:
                 # Existing card
-                card = [
-                    card for card in self.visible_cards if card.name == feedback.name
-                ][0]
+                card = self.card_index.by_name(feedback.name)
                 if update_description and card.description != feedback.description:
-                    card.set_description(feedback.description)
-                    self._clear_card_cache()
+                    writes.set_description(card, feedback.description)
                 if update_bugs and feedback.bugs:
                     attachments = card.attachments
                     for bug in feedback.bugs:
                         if bug not in [a["url"] for a in attachments]:
-                            card.attach(url=bug)
-                            self._clear_card_cache()
-        self._clear_card_cache()
+                            writes.attach(card, url=bug)
+        return writes.flush()
 
     def setup_board(self):
         super().setup_board()
         try:
             feedback_label = self.feedback_label  # noqa: F841
         except StopIteration:
-            self._board.add_label(self.FEEDBACK_LABEL_NAME, self.FEEDBACK_LABEL_COLOR)
-            self._labels = None  # clear cache
+            self._add_board_label(self.FEEDBACK_LABEL_NAME, self.FEEDBACK_LABEL_COLOR)
 
 
 class ScrumBoard(TrelloBoard):
@@ -669,124 +1741,188 @@ class ScrumBoard(TrelloBoard):
     def __init__(self, *args, product_categories=[], **kwargs):
         super().__init__(*args, **kwargs)
         self.product_categories = product_categories
+        self._card_states = None
 
     def setup_board(self):
         super().setup_board()
 
-    def add_pull(self, pulls):
-        """Create a card to review a pull request"""
-        lst = [lst for lst in self.lists if lst.name == self.REVIEW_LIST][0]
-        existing_cards = [card for card in lst.list_cards()]
-        existing_urls = []
-        for card in existing_cards:
-            for attachment in card.attachments:
+    def _review_cards(self, lst):
+        """Names and pull request urls of the cards on lst
+
+        The cached snapshot is used when loaded, otherwise the list is fetched
+        once with its attachments.
+        """
+        if self._visible_cards is not None:
+            cards = [
+                (card.name, card.attachments or [])
+                for card in self.visible_cards
+                if card.list_id == lst.id
+            ]
+        else:
+            cards = [
+                (card["name"], card.get("attachments", []))
+                for card in self._client.fetch_json(
+                    f"/lists/{lst.id}/cards",
+                    query_params={
+                        "fields": "name",
+                        "attachments": "true",
+                        "attachment_fields": "url",
+                    },
+                )
+            ]
+        names = set()
+        urls = set()
+        for name, attachments in cards:
+            names.add(name)
+            for attachment in attachments:
                 url = attachment.get("url", "")
                 if "/pull/" in url:
-                    self.logger.debug(f"Found existing PR: {url} on {card.name}")
-                    existing_urls.append(url)
+                    self.logger.debug(f"Found existing PR: {url} on {name}")
+                    urls.add(url)
+        return names, urls
+
+    def add_pull(self, pulls):
+        """Create a card to review each pull request without one"""
+        lst = self._list(self.REVIEW_LIST)
+        names, urls = self._review_cards(lst)
+        writes = self.write_buffer()
+        cards = []
+        skipped = 0
         for pull in pulls:
             self.logger.debug(f"Adding card for {pull.url}")
             name = f'PR Review {pull.url.split("/")[-3]} #{pull.number}'
             desc = f"""{pull.reason}
                     Url: {pull.url}
                     {pull.body}"""
-            if name in [card.name for card in existing_cards]:
+            if name in names:
                 self.logger.debug(f"Skipping, card already exists: {name}")
+                skipped += 1
                 continue
-            elif pull.url in existing_urls:
+            elif pull.url in urls:
                 self.logger.debug(f"Skipping, url already exists: {pull.url}")
+                skipped += 1
                 continue
-            self.logger.info(f"Added card for: {pull.url}")
-            card = lst.add_card(name=name, desc=desc, position="bottom")
-            card.attach(url=pull.url)
-        self._clear_card_cache()
-
-    def create_release(self, release):
-        """Create A new release list"""
-        pos = None
-        all_lists = self._board.all_lists()
-        list_present = False
-        for lst in all_lists:
-            if release == lst.name:
-                list_present = True
-        if not list_present:
-            for lst in all_lists:
-                if self.IN_PROGRESS_LIST.lower() == lst.name.lower():
+            names.add(name)
+            urls.add(pull.url)
+            self.logger.info(f"Adding card for: {pull.url}")
+            card = writes.create_card(
+                name, lst, name=name, desc=desc, position="bottom"
+            )
+            writes.attach(card, url=pull.url)
+            cards.append(card)
+        summary = writes.flush()
+        if self.dry_run:
+            self.logger.info(
+                f"Review cards: {len(cards)} would be created, {skipped} skipped"
+            )
+        else:
+            created = sum(1 for card in cards if card.done)
+            self.logger.info(
+                f"Review cards: {created} created, {len(cards) - created} failed,"
+                f" {skipped} skipped"
+            )
+        return summary
+
+    def create_release(self, release, writes=None):
+        """Create the release list and labels this board is missing
+
+        Creations are queued on writes when given, otherwise they are sent
+        here and the WriteSummary is returned. Each creation has its own key so
+        one failure does not skip the others.
+        """
+        flush = writes is None
+        if flush:
+            writes = self.executor()
+        if not self.registry.list(release):
+            pos = None
+            for lst in self.lists:
+                if self.IN_PROGRESS_LISTS[0].lower() == lst.name.lower():
                     pos = lst.pos - 1
                     break
-            self._board.add_list(release, pos)
-            self._lists = None  # Clear cache
-
+            writes.submit(
+                (self.name, release, "list"),
+                self._add_board_list,
+                release,
+                pos,
+                description=f"create list {release} on {self.name}",
+            )
         for color in self.RELEASE_COLORS:
-            self._board.add_label(release, color)
-        self._labels = None  # Clear cache
+            if self.registry.label(release, color):
+                continue
+            writes.submit(
+                (self.name, release, color),
+                self._add_board_label,
+                release,
+                color,
+                description=f"create {color} label {release} on {self.name}",
+            )
+        if flush:
+            return writes.flush()
 
     def create_cards(self, roadmap_features):
         """Create cards for a list of roadmap features"""
-        card_names = [card.name for card in self.visible_cards]
         self.logger.info("Creating roadmap cards")
+        writes = self.executor()
         for feature in roadmap_features:
             if feature.category not in self.product_categories:
                 self.logger.debug(
                     f"{self.name} not adding {feature}, category does not match"
                 )
                 continue
-            if feature.name in card_names:
+            if feature.name in self.card_index:
                 # Card already exists
                 self.logger.debug(
                     f"{self.name} not adding {feature}, card already exists"
                 )
                 continue
-            lst = [lst for lst in self.lists if lst.name == feature.release][0]
-            label = [
-                label
-                for label in self.labels
-                if label.name == feature.release and label.color == "green"
-            ][0]
+            lst = self._list(feature.release)
+            label = self.registry.label(feature.release, "green")
             self.logger.debug(f"Adding card {feature.name}")
-            lst.add_card(name=feature.name, labels=[label], position="bottom")
-            self._clear_card_cache()
+            writes.submit(
+                feature.name,
+                self._create_card,
+                lst,
+                name=feature.name,
+                labels=[label],
+                position="bottom",
+                description=f"create card {feature.name}",
+            )
+        return writes.flush()
 
     def tag_release(self, features):
         """Add feature tags to existing cards"""
         self.logger.info("Tagging existing cards with relese")
         for feature in features:
-            release_label = [
-                label
-                for label in self.labels
-                if label.name == feature.release and label.color == "green"
-            ][0]
+            release_label = self.registry.label(feature.release, "green")
             self.logger.debug(f"Looking for feature {feature.name}")
-            for card in self.visible_cards:
-                if card.name == feature.name:
-                    self.logger.debug(f"Found card {card.name}")
-                    try:
-                        next(
-                            filter(lambda x: x.name == release_label.name, card.labels)
-                        )
-                        # Already labeled
-                        self.logger.debug(f"Found existing lable, skipping {card.name}")
-                        break
-                    except (StopIteration, TypeError):
-                        # No lables, or no release label
-                        pass
-                    self.logger.debug(f"Labeling card {card.name}")
-                    card.add_label(release_label)
-                    self._claer_card_cache()
-                    break
+            card = self.card_index.by_name(feature.name)
+            if not card:
+                continue
+            self.logger.debug(f"Found card {card.name}")
+            try:
+                next(filter(lambda x: x.name == release_label.name, card.labels))
+                # Already labeled
+                self.logger.debug(f"Found existing lable, skipping {card.name}")
+                continue
+            except (StopIteration, TypeError):
+                # No lables, or no release label
+                pass
+            self.logger.debug(f"Labeling card {card.name}")
+            self._add_label(card, release_label)
 
     def label_stale_cards(self, lists=[], delta=datetime.timedelta(days=5)):
         if not lists:
             lists = self.IN_PROGRESS_LISTS
-        super().label_stale_cards(lists, delta)
+        return super().label_stale_cards(lists, delta)
 
     def get_release_features(self, release, visible=True):
-        release_labels = filter(
-            lambda x: x.name == release and x.color in self.RELEASE_COLORS, self.labels
-        )
-        release_ids = [lbl.id for lbl in release_labels]
+        release_ids = [
+            lbl.id
+            for lbl in self.registry.labels_named(release)
+            if lbl.color in self.RELEASE_COLORS
+        ]
         if visible:
-            cards = self._board.visible_cards()
+            cards = self.visible_cards
         else:
             cards = self.cards
 
@@ -808,58 +1944,75 @@ class ScrumBoard(TrelloBoard):
             )
         return features
 
-    def _get_card_status(self, card, release=None, skip_cards=[]):
-        lst = next(filter(lambda x: x.id == card.list_id, self.lists))
+    def _base_state(self, card, list_names):
+        """State of card from its list and checklists, ignoring attachments"""
+        list_name = list_names.get(card.list_id, "")
+        if list_name.lower().startswith("done"):
+            return ScrumStatus.DONE
+        if list_name in self.IN_PROGRESS_LISTS:
+            return ScrumStatus.IN_PROGRESS
+        # Started if checklist has completed items
+        if self.checklists.has_checked(card.id):
+            return ScrumStatus.IN_PROGRESS
+        return ScrumStatus.NOT_STARTED
+
+    @property
+    def card_states(self):
+        """State of every visible card, computed in one pass over the board
+
+        A card that is not started is started when any card it attaches *on this
+        board*, directly or through other attached cards, has started.
+        """
+        graph = self.card_graph
+        if self._card_states is not None and self._card_states[0] is graph:
+            return self._card_states[1]
+        list_names = self.registry.list_names()
+        states = {
+            card.id: self._base_state(card, list_names) for card in self.visible_cards
+        }
+        active = [
+            card_id
+            for card_id, state in states.items()
+            if state != ScrumStatus.NOT_STARTED
+        ]
+        for card_id in graph.reaching(active):
+            if states.get(card_id) == ScrumStatus.NOT_STARTED:
+                states[card_id] = ScrumStatus.IN_PROGRESS
+        self._card_states = (graph, states)
+        return states
+
+    def _get_card_status(self, card, release=None):
+        state = self.card_states.get(card.id)
+        if state is None:
+            # Not a visible card, only its own list and checklists count
+            state = self._base_state(card, self.registry.list_names())
         status = ScrumStatus()
-        if lst.name.lower().startswith("done"):
+        if state == status.DONE:
             status.done()
-        elif lst.name in self.IN_PROGRESS_LISTS:
+        elif state == status.IN_PROGRESS:
             status.started()
-        else:
-            # Set started if checklist has completed items
-            for chklst in card.checklists:
-                for item in chklst.items:
-                    if item["checked"]:
-                        status.started()
-            # Set started if an attached card *on this board* has started
-            for attachment in card.get_attachments():
-                if attachment.is_upload:
-                    self.logger.debug(f"Skipping upload")
-                    continue
-                if not attachment.url:
-                    self.logger.debug(f"Skipping no url")
-                    continue
-                if attachment.url in skip_cards:
-                    self.logger.debug(f"Skipping skip_card: {attachment.url}")
-                    continue
-                self.logger.debug(f"Searching: {attachment.url}")
-                try:
-                    subcard = next(
-                        filter(lambda x: x.url == attachment.url, self.visible_cards)
-                    )
-                except StopIteration:
-                    # Card not found on this board
-                    self.logger.debug(
-                        f"Attachment not card on this board: {attachment.url}"
-                    )
-                    continue
-                skip_cards.append(card.url)
-                substatus = self._get_card_status(
-                    subcard, release=release, skip_cards=skip_cards
-                )
-                self.logger.debug(f"SubStatus: {substatus}")
-                if substatus != substatus.NOT_STARTED:
-                    status.started()
         if release:
             try:
                 label = next(filter(lambda x: x.name == release, card.labels))
                 status.set_color(label.color)
-            except TypeError:
+            except (StopIteration, TypeError):
                 # Don't set color if there is no release label
                 self.logger.debug(f"Not setting color on status: {card.name}")
         return status
 
 
+def create_releases(boards, releases):
+    """Create missing release lists and labels on every board in one batch"""
+    boards = list(boards)
+    if not boards:
+        return None
+    writes = boards[0].executor()
+    for board in boards:
+        for release in releases:
+            board.create_release(release, writes=writes)
+    return writes.flush()
+
+
 class ScrumStatus:
     NOT_STARTED = 1
     IN_PROGRESS = 2
@@ -1,4 +1,5 @@
 #!/bin/env python3
+from itertools import chain
 
 from utils import CDKUtils
 
@@ -17,8 +18,10 @@ def main():
         # Update product feedback
         print(f"Updating Product Feedback: {team}")
         feedback = utils.get_product_feedback(team)
-        features = backlog_board.get_features(visible=False)
-        features.extend(scrum_board.get_features())
+        features = chain(
+            backlog_board.iter_features(visible=False),
+            scrum_board.iter_features(),
+        )
         feedback.update_features(features)
 
 
@@ -1,46 +1,103 @@
+import atexit
+from pathlib import Path
+
 import confuse
 from trello import TrelloClient
 
+from roadmap.cache import BoardCache
 from roadmap.github import RepoGroup
 from roadmap.gsheets import ProductFeedback, Roadmap
 from roadmap.jira import Project
-from roadmap.trello import BacklogBoard, ScrumBoard, SizingBoard
+from roadmap.session import PooledSession
+from roadmap.trello import BacklogBoard, ScrumBoard, SharedCardIndex, SizingBoard
 
 
 class CDKUtils:
     def __init__(self, dry_run=False):
         self.config = confuse.Configuration("cdk-scripts")
         self.dry_run = dry_run
+        self._board_cache = None
+        self._trello_clients = {}
+        self._boards = {}
+        self.card_index = SharedCardIndex()
+        if self._trello_flag("report_requests", False):
+            atexit.register(self.report_request_counts)
+
+    def _trello_option(self, name, default):
+        if self.config["Trello"][name].exists():
+            return self.config["Trello"][name].get(int)
+        return default
+
+    def _trello_flag(self, name, default):
+        if self.config["Trello"][name].exists():
+            return self.config["Trello"][name].get(bool)
+        return default
 
     def get_trello_client(self):
-        return TrelloClient(
-            self.config["Trello"]["api_key"].get(str),
-            self.config["Trello"]["api_secret"].get(str),
-        )
+        """Return the Trello client shared by every board in this process"""
+        api_key = self.config["Trello"]["api_key"].get(str)
+        api_secret = self.config["Trello"]["api_secret"].get(str)
+        client = self._trello_clients.get((api_key, api_secret))
+        if client is None:
+            session = PooledSession(
+                pool_size=self._trello_option("pool_size", 16),
+                timeout=self._trello_option("timeout", 30),
+            )
+            client = TrelloClient(api_key, api_secret, http_service=session)
+            self._trello_clients[(api_key, api_secret)] = client
+        return client
+
+    def request_counts(self):
+        """Return the request counters of every Trello session"""
+        return [client.http_service.counts for client in self._trello_clients.values()]
+
+    def report_request_counts(self):
+        """Print the requests made by every Trello session, regardless of the
+        log level"""
+        for client in self._trello_clients.values():
+            print(f"Trello: {client.http_service.summary()}")
+
+    def get_board_cache(self):
+        """Persistent board cache in the config dir, disabled by Trello.cache: false"""
+        if not self._trello_flag("cache", True):
+            return None
+        if self._board_cache is None:
+            path = Path(self.config.config_dir()) / "trello-cache.sqlite"
+            self._board_cache = BoardCache(path)
+        return self._board_cache
+
+    def _get_board(self, cls, short_id, **kwargs):
+        """Return the board for short_id, opened once per process
+
+        Boards share one card index so links resolve across boards.
+        """
+        board = self._boards.get(short_id)
+        if board is None:
+            board = cls(
+                client=self.get_trello_client(),
+                cache=self.get_board_cache(),
+                dry_run=self.dry_run,
+                shared_index=self.card_index,
+                short_id=short_id,
+                **kwargs,
+            )
+            self._boards[short_id] = board
+        return board
 
     def get_scrum_board(self, team):
-        board = ScrumBoard(
-            client=self.get_trello_client(),
+        return self._get_board(
+            ScrumBoard,
+            self.config[team]["scrum_id"].get(str),
             product_categories=self.config[team]["product_categories"].get(list),
-            short_id=self.config[team]["scrum_id"].get(str),
         )
-        return board
 
     def get_backlog_board(self, team):
         """Provide the config key as team"""
-        board = BacklogBoard(
-            client=self.get_trello_client(),
-            short_id=self.config[team]["backlog_id"].get(str),
-        )
-        return board
+        return self._get_board(BacklogBoard, self.config[team]["backlog_id"].get(str))
 
     def get_sizing_board(self, team):
         """Provide the config key as team"""
-        board = SizingBoard(
-            client=self.get_trello_client(),
-            short_id=self.config[team]["sizing_id"].get(str),
-        )
-        return board
+        return self._get_board(SizingBoard, self.config[team]["sizing_id"].get(str))
 
     def get_product_roadmap(self, release, team=None):
         return Roadmap(
@@ -2,6 +2,7 @@
 
 import argparse
 
+from roadmap.trello import create_releases
 from utils import CDKUtils
 
 
@@ -20,8 +21,8 @@ def main():
     scrum_boards = utils.get_scrum_boards()
     roadmap = utils.get_product_roadmap(args.release)
     roadmap_features = roadmap.get_features()
+    create_releases(scrum_boards, [args.release])
     for board in scrum_boards:
-        board.create_release(args.release)
         board.tag_release(roadmap_features)
 
 